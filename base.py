@@ -1,17 +1,45 @@
 # scene_base.py
+from utils.dirty import DirtyTracker
+from utils.transition import Transition
 
 class SceneBase:
     def __init__(self):
         self.next_scene = self
+        # 描き直しが必要な領域（差分描画モード用。run_gameがpresent()で画面に送る）
+        self.dirty = DirtyTracker()
+        # 画面の切り替え演出（updateで進め、renderの最後にdrawで重ねる）
+        self.transition = Transition()
 
     def process_input(self, events, keys):
         pass
 
-    def update(self):
+    def update(self, dt):
+        # dt: 前回のupdateからの経過秒数（run_gameが固定の刻みで呼ぶ）
         pass
 
     def render(self, screen):
         pass
 
     def switch_to_scene(self, next_scene):
+        # next_sceneはシーンかシーンのクラス（クラスならrun_gameが使い回しのインスタンスに切り替える）
         self.next_scene = next_scene
+
+    def is_ready(self):
+        # 素材の読み込み待ちならFalse（入力の記録・再生はその間フレームを数えない）
+        return True
+
+    def on_suspend(self):
+        # 他のシーンに切り替わる時に呼ばれる（インスタンスは捨てずに取っておかれる）
+        pass
+
+    def on_resume(self):
+        # 取っておかれたシーンに戻ってきた時に呼ばれる
+        pass
+
+    def on_quit(self):
+        # ウィンドウを閉じた時やESCでゲームを終える直前に呼ばれる（保存すべきものはここで書き終える）
+        pass
+
+    def dispose(self):
+        # シーンを使い終わる時に呼ばれる（借りている素材を返す）
+        pass
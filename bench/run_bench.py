@@ -0,0 +1,276 @@
+"""
+GameScene をディスプレイ・サウンド無しで動かすベンチマーク。
+
+scenarios/episode1.json の全チャプター・全選択肢ルートと、自動生成した大きなシナリオを
+クリックイベントで最後まで進め、FPS・1フレームの描画時間・チャプター移動の時間・最大メモリ使用量を表示する。
+
+使い方（リポジトリのルートで）:
+    python bench/run_bench.py
+    python bench/run_bench.py --large-chapters 40 --large-lines 2000 --json bench.json
+"""
+import argparse
+import collections
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+# 画面もGPUも無いCI環境で動かすためのダミードライバ（pygameのimport前に設定する）
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import pygame  # noqa: E402
+
+from base import SceneBase  # noqa: E402
+from systems.profiler import percentile  # noqa: E402
+from systems.scenario import Choices, load_scenario  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class EndOfScenario(SceneBase):
+    """endに到達したときの遷移先（計測対象外のタイトル画面の代わり）"""
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    # Linuxではキロバイト単位
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def enumerate_paths(chapters, start, max_paths=256):
+    """開始チャプターから選べる選択肢の並び（選択肢番号のタプル）をすべて列挙する"""
+    paths = []
+
+    def walk(key, path, visited):
+        if len(paths) >= max_paths:
+            return
+        choices = None
+        for op in chapters.get(key, []):
+            if isinstance(op, Choices):
+                choices = op.choices
+                break
+        if not choices:
+            paths.append(path)
+            return
+        for idx, (_, jump_key) in enumerate(choices):
+            if jump_key in visited or jump_key not in chapters:
+                # ループや行き先の無い選択肢はそこで打ち切る
+                paths.append(path + (idx,))
+                continue
+            walk(jump_key, path + (idx,), visited | {jump_key})
+
+    walk(start, (), {start})
+    return paths
+
+
+def generate_scenario(path, num_chapters, lines_per_chapter, seed=0):
+    """ベンチマーク用の大きなシナリオJSONを作る"""
+    rng = random.Random(seed)
+    kana = "あいうえおかきくけこさしすせそたちつてとなにぬねのはひふへほまみむめもやゆよらりるれろわをん、。魔王師匠森"
+    scenario = {}
+    for chapter in range(num_chapters):
+        lines = [f"bg={rng.randint(1, 6)}"]
+        for line_no in range(lines_per_chapter):
+            roll = rng.random()
+            if roll < 0.02:
+                lines.append(f"bg={rng.randint(1, 6)}")
+            elif roll < 0.04:
+                lines.append(f"cha=Character{rng.randint(1, 2)},1,{rng.randint(1, 3)}")
+            elif roll < 0.05:
+                lines.append("cha=none")
+            else:
+                text = "".join(rng.choice(kana) for _ in range(rng.randint(10, 50)))
+                if rng.random() < 0.2:
+                    text += "$" + "".join(rng.choice(kana) for _ in range(rng.randint(10, 40)))
+                lines.append(f"{rng.randint(0, 4)}{text}")
+        if chapter + 1 < num_chapters:
+            targets = sorted({chapter + 1, min(num_chapters - 1, chapter + 2)})
+            lines.append({"choices": [{"label": f"ルート{t}", "jump": f"0,{t}"} for t in targets]})
+        else:
+            lines.append("end")
+        scenario[f"0,{chapter}"] = lines
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(scenario, f, ensure_ascii=False)
+
+
+def play(scenario_path, choice_path, frames_per_click, screen, max_clicks=100000):
+    """1つの選択肢ルートを最後までクリックで進め、計測結果を返す"""
+    import scenes.title
+    from scenes.game import GameScene
+
+    scenes.title.HomeScene = EndOfScenario
+    scene = GameScene(scenario_path)
+    keys = pygame.key.get_pressed()
+    render_ms = []
+    jump_ms = []
+
+    jump_to_chapter = scene.jump_to_chapter
+
+    def timed_jump(chapter_key):
+        start = time.perf_counter()
+        jump_to_chapter(chapter_key)
+        jump_ms.append((time.perf_counter() - start) * 1000)
+
+    scene.jump_to_chapter = timed_jump
+
+    choice_path = list(choice_path)
+    clicks = 0
+    frames = 0
+    start = time.perf_counter()
+    while scene.next_scene is scene and clicks < max_clicks:
+        if scene.show_choices and scene.choice_buttons:
+            idx = choice_path.pop(0) if choice_path else 0
+            pos = scene.choice_buttons[idx].center
+        else:
+            pos = scene.text_window_rect.center
+        before = (scene.chapter, scene.line_index, scene.show_choices, scene.is_text_animating)
+        event = pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1)
+        scene.process_input([event], keys)
+        clicks += 1
+        # 切り替え演出中のクリックは演出の後に回されるので、演出が終わるまでは次のクリックをしない
+        step = 0
+        while step < frames_per_click or (scene.transition.active and scene.next_scene is scene):
+            step += 1
+            scene.update(1 / 60)
+            t = time.perf_counter()
+            scene.render(screen)
+            scene.dirty.present()
+            render_ms.append((time.perf_counter() - t) * 1000)
+            frames += 1
+        after = (scene.chapter, scene.line_index, scene.show_choices, scene.is_text_animating)
+        if after == before and not scene.is_text_animating:
+            # シナリオの末尾（これ以上進まない）
+            break
+    elapsed = time.perf_counter() - start
+    scene.dispose()
+    return {
+        "clicks": clicks,
+        "frames": frames,
+        "seconds": elapsed,
+        "render_ms": render_ms,
+        "jump_ms": jump_ms,
+        "reached_end": scene.next_scene is EndOfScenario,
+        "final": (scene.chapter, scene.line_index),
+    }
+
+
+def summarize(name, runs):
+    render_ms = sorted(ms for run in runs for ms in run["render_ms"])
+    jump_ms = sorted(ms for run in runs for ms in run["jump_ms"])
+    frames = sum(run["frames"] for run in runs)
+    seconds = sum(run["seconds"] for run in runs)
+    return {
+        "name": name,
+        "paths": len(runs),
+        "clicks": sum(run["clicks"] for run in runs),
+        "frames": frames,
+        "fps": frames / seconds if seconds else 0.0,
+        "render_ms_mean": sum(render_ms) / len(render_ms) if render_ms else 0.0,
+        "render_ms_p95": percentile(render_ms, 95),
+        "render_ms_p99": percentile(render_ms, 99),
+        "jump_ms_mean": sum(jump_ms) / len(jump_ms) if jump_ms else 0.0,
+        "jump_ms_max": jump_ms[-1] if jump_ms else 0.0,
+        "reached_end": sum(1 for run in runs if run["reached_end"]),
+    }
+
+
+def bench_scenario(name, scenario_path, frames_per_click, screen, max_paths):
+    chapters = load_scenario(scenario_path)
+    start_chapter = next(iter(chapters), None)
+    runs = [
+        play(scenario_path, path, frames_per_click, screen)
+        for path in enumerate_paths(chapters, start_chapter, max_paths)
+    ]
+    return summarize(name, runs)
+
+
+def skip_through(scenario_path, screen, max_frames=100000):
+    """Ctrlを押しっぱなしにしたスキップで最初の選択肢ルートを最後まで進め、1秒あたりの行数を返す"""
+    from scenes.game import GameScene
+
+    scene = GameScene(scenario_path)
+    keys = collections.defaultdict(bool, {pygame.K_LCTRL: True})
+    frames = 0
+    start = time.perf_counter()
+    while frames < max_frames:
+        events = []
+        if scene.show_choices and scene.choice_buttons:
+            events.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=scene.choice_buttons[0].center, button=1))
+        before = (scene.chapter, scene.line_index)
+        scene.process_input(events, keys)
+        scene.update(1 / 60)
+        scene.render(screen)
+        scene.dirty.present()
+        frames += 1
+        if (scene.chapter, scene.line_index) == before and not scene.show_choices:
+            break
+    elapsed = time.perf_counter() - start
+    lines = scene.read_log.count()
+    scene.dispose()
+    return {"lines": lines, "frames": frames, "seconds": elapsed, "lines_per_second": lines / elapsed if elapsed else 0.0}
+
+
+def print_result(result):
+    print(
+        "{name:<24} paths={paths:<4} frames={frames:<7} fps={fps:8.1f} "
+        "render mean={render_ms_mean:6.2f}ms p95={render_ms_p95:6.2f}ms p99={render_ms_p99:6.2f}ms "
+        "jump mean={jump_ms_mean:6.2f}ms max={jump_ms_max:6.2f}ms end={reached_end}/{paths}".format(**result)
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="GameSceneのヘッドレスベンチマーク")
+    parser.add_argument("--scenario", default=os.path.join("scenarios", "episode1.json"))
+    parser.add_argument("--frames-per-click", type=int, default=5, help="クリックごとに描画するフレーム数")
+    parser.add_argument("--max-paths", type=int, default=64, help="計測する選択肢ルートの上限")
+    parser.add_argument("--large-chapters", type=int, default=10, help="生成シナリオのチャプター数（0で生成しない）")
+    parser.add_argument("--large-lines", type=int, default=100, help="生成シナリオの1チャプターの行数")
+    parser.add_argument("--json", help="結果をJSONで書き出すファイル")
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    screen = pygame.display.set_mode((1920, 1080))
+    # 既読データはプレイヤーのものを上書きしないよう一時ディレクトリに書く
+    save_dir = tempfile.TemporaryDirectory()
+    os.environ["NOVEL_SAVE_DIR"] = save_dir.name
+
+    results = [bench_scenario(os.path.basename(args.scenario), args.scenario, args.frames_per_click, screen, args.max_paths)]
+    print_result(results[-1])
+
+    if args.large_chapters > 0:
+        with tempfile.TemporaryDirectory() as tmp:
+            large_path = os.path.join(tmp, "generated.json")
+            generate_scenario(large_path, args.large_chapters, args.large_lines)
+            name = f"generated {args.large_chapters}x{args.large_lines}"
+            # 生成シナリオは一本道＋分岐なので、全ルートではなく先頭のルートだけ測る
+            results.append(bench_scenario(name, large_path, args.frames_per_click, screen, 1))
+            print_result(results[-1])
+            skip = skip_through(large_path, screen)
+            print(f"{'skip ' + name:<24} lines={skip['lines']:<7} frames={skip['frames']:<7} lines/s={skip['lines_per_second']:10.1f}")
+
+    rss = peak_rss_mb()
+    if rss is not None:
+        print(f"peak RSS: {rss:.1f} MB")
+    from systems.audio import audio
+    audio_stats = audio.stats()
+    print("click sound: buffer latency {buffer_latency_ms:.1f} ms, play call max {se_play_ms_max:.2f} ms".format(**audio_stats))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"results": results, "peak_rss_mb": rss, "audio": audio_stats}, f, indent=2, ensure_ascii=False)
+    save_dir.cleanup()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,49 +1,137 @@
+# 起動時間の計測はimport前から始める
+from systems.startup import startup
 import pygame
 import sys
-import os  # パス確認用
+import os
+import argparse
+import atexit
+import importlib
 
-def run_game(start_scene):
-    pygame.init()
-    screen = pygame.display.set_mode((1920, 1080))
+from base import SceneBase
+from systems.audio import audio
+from systems.display import LOGICAL_SIZE, SCALE_FILTERS, Display, parse_size, set_display
+from systems.profiler import profiler
+from systems.replay import InputRecorder, InputReplayer
+from systems.scene_manager import scene_manager
+from systems.scheduler import FPS_CAPS, FrameScheduler
+
+def create_screen(size, vsync=False):
+    """ウィンドウを作る。vsyncが使えない環境では通常のウィンドウにする"""
+    if vsync:
+        try:
+            return pygame.display.set_mode(size, pygame.SCALED, vsync=1)
+        except pygame.error as e:
+            print(f"VSync is not available: {e}")
+    return pygame.display.set_mode(size)
+
+def load_home_scene():
+    """タイトルシーンを必要になった時点でimportして作る"""
+    return importlib.import_module("scenes.title").HomeScene()
+
+def resume_game_scene(slot):
+    """セーブスロットから直接ゲーム画面を作る（セーブが無ければ最初から）"""
+    scene = importlib.import_module("scenes.game").GameScene()
+    if not scene.load_game(slot):
+        print(f"No save data in slot '{slot}', starting from the beginning")
+    return scene
+
+def run_game(start_scene, fps="60", window_size=LOGICAL_SIZE, render_size=None, scale_filter="smooth",
+             recorder=None, replayer=None):
+    """
+    start_scene はシーンそのものか、シーンを作る関数。
+    関数を渡した場合は先に真っ黒な最初のフレームを出してからシーンを作る。
+    render_size を window_size より小さくすると、その解像度で描いて毎フレーム1回だけ拡大する。
+    recorder を渡すと入力を記録する。replayer を渡すと実際の入力の代わりに記録した入力で動かし、
+    再生し終えたら結果を確かめて終了する（一致しなければ終了コード1）。
+    """
+    startup.stage("import")
+    # ミキサーなど使うまで要らないモジュールは初期化しない（音はタイトル画面が必要になった時点で初期化する）
+    pygame.display.init()
+    pygame.font.init()
+    display = Display(create_screen(window_size, vsync=(fps == "vsync")), render_size, scale_filter)
+    set_display(display)
+    screen = display.surface  # シーンはこのSurfaceに描く
     pygame.display.set_caption("My Game")
-    clock = pygame.time.Clock()
-    
-    # デバッグ情報：Pythonパスとカレントディレクトリを確認
-    print(f"Current directory: {os.getcwd()}")
-    print(f"Python path: {sys.path}")
-    print(f"Available modules in scenes directory:")
-    try:
-        scenes_dir = os.path.join(os.getcwd(), "scenes")
-        if os.path.exists(scenes_dir):
-            files = os.listdir(scenes_dir)
-            for file in files:
-                print(f"  - {file}")
-    except Exception as e:
-        print(f"Error listing scenes directory: {e}")
+    startup.stage("display")
+    # 時計はここで1つだけ持つ（各シーンはtickしない）
+    scheduler = FrameScheduler(fps_cap=FPS_CAPS[fps])
 
-    current_scene = start_scene
+    # 最初のフレーム（シーンの準備ができるまでのプレースホルダー）
+    display.window.fill((0, 0, 0))
+    pygame.display.flip()
+    startup.stage("first_frame")
+
+    if isinstance(start_scene, SceneBase):
+        current_scene = start_scene
+    else:
+        current_scene = start_scene()
+    # シーンは作り直さずに使い回す（タイトルとゲームを行き来しても読み込み直さない）
+    scene_manager.add(current_scene)
+    # ESCや終了ボタンでシーンがexit()した時も含め、終わる時にはシーンを片付けて共有の素材を返す
+    atexit.register(scene_manager.dispose_all)
+    startup.stage("start_scene")
 
     while True:
+        # フレームレート制御（このフレームで進める固定ステップ数も決まる）
+        steps = scheduler.tick()
+        profiler.start_frame()
         # イベント取得
         events = pygame.event.get()
         keys = pygame.key.get_pressed()
+        if replayer is not None:
+            # 再生中は閉じる操作だけ受け付け、入力とステップ数は記録どおりにする
+            events = [event for event in events if event.type == pygame.QUIT]
+            steps, replay_events = replayer.next_frame(current_scene)
+            events += replay_events
+            keys = replayer.keys
         
         # 基本的なイベント処理
         for event in events:
             if event.type == pygame.QUIT:
+                current_scene.on_quit()
                 pygame.quit()
                 sys.exit()
+            # ウィンドウが隠れて再表示されたら全体を描き直す
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                current_scene.dirty.mark_all()
+            # 拡大表示しているときはマウス座標を描画先の座標に直す（再生した入力は最初から描画先の座標）
+            if display.dest is not None and hasattr(event, "pos") and replayer is None:
+                event.pos = display.to_render(event.pos)
+        if recorder is not None:
+            recorder.record(current_scene, steps, events, keys)
         
         try:
             # シーン処理
-            current_scene.process_input(events, keys)
-            current_scene.update()
+            try:
+                current_scene.process_input(events, keys)
+            except SystemExit:
+                # ESCや終了ボタンでシーンがexit()した。終了の入力は記録に残さず、再生ならここで結果を確かめる
+                if recorder is not None:
+                    recorder.drop_frame()
+                if replayer is not None:
+                    sys.exit(0 if replayer.finish(current_scene) else 1)
+                raise
+            profiler.mark("input")
+            for _ in range(steps):
+                current_scene.update(scheduler.step)
+            profiler.mark("update")
             current_scene.render(screen)
-            
+            profiler.draw_overlay(screen, current_scene.dirty)
+            profiler.mark("render")
+            display.present(current_scene.dirty)
+            profiler.mark("flip")
+            if replayer is not None:
+                replayer.check_frame(screen)
+                if replayer.done:
+                    ok = replayer.finish(current_scene)
+                    pygame.quit()
+                    sys.exit(0 if ok else 1)
+
             # シーン変更があれば次のシーンへ
-            if current_scene.next_scene != current_scene:
-                print(f"Switching scene to: {current_scene.next_scene.__class__.__name__}")
-                current_scene = current_scene.next_scene
+            if current_scene.next_scene is not current_scene:
+                current_scene = scene_manager.switch(current_scene, current_scene.next_scene)
+                print(f"Switching scene to: {current_scene.__class__.__name__}")
+                current_scene.dirty.mark_all()
                 pygame.event.clear()  # シーン切替時にイベントをクリア
         except Exception as e:
             print(f"Error in game loop: {e}")
@@ -59,9 +147,48 @@ def run_game(start_scene):
                 except:
                     pass
             
-        # フレームレート制御
-        clock.tick(60)
+        profiler.end_frame()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="魔王戦まで3日")
+    parser.add_argument("--fps", choices=list(FPS_CAPS), default="60", help="フレームレートの上限（uncappedは上限なし、vsyncは画面の更新に合わせる）")
+    parser.add_argument("--profile", action="store_true", help="フレーム時間を計測する（環境変数 NOVEL_PROFILE=1 でも可）")
+    parser.add_argument("--profile-overlay", action="store_true", help="計測結果を画面に重ねて表示する（NOVEL_PROFILE=overlay でも可）")
+    parser.add_argument("--resolution", type=parse_size, default=LOGICAL_SIZE, metavar="WxH", help="ウィンドウの大きさ（例: 1280x720）。素材はこの大きさに縮小して読み込む")
+    parser.add_argument("--render-resolution", type=parse_size, metavar="WxH", help="描画する解像度（省略時はウィンドウと同じ）。ウィンドウと違う場合は毎フレーム1回だけ拡大する")
+    parser.add_argument("--scale", choices=SCALE_FILTERS, default="smooth", help="--render-resolutionから拡大するときの方法")
+    parser.add_argument("--audio-buffer", type=int, default=512, help="ミキサーのバッファサイズ（サンプル数。小さいほど効果音の遅延が減るが、音が途切れやすくなる）")
+    parser.add_argument("--resume", nargs="?", const="auto", metavar="SLOT", help="タイトル画面を飛ばしてセーブスロットから再開する（省略時は自動セーブ）")
+    parser.add_argument("--record", metavar="LOG", help="プレイ中の入力をフレーム番号つきでLOG（JSON）に記録する")
+    parser.add_argument("--replay", metavar="LOG", help="--recordで記録した入力で動かし、最後のチャプターと行が記録と同じか確かめる")
+    parser.add_argument("--replay-speed", choices=("real", "max"), default="real", help="再生の速さ（maxはフレームレートの上限なしで回す）")
+    parser.add_argument("--replay-checksums", action="store_true", help="毎フレームの画面のチェックサムも比べる（記録に無ければ今回の結果を基準として書き足す）")
+    parser.add_argument("--headless", action="store_true", help="ウィンドウと音を出さずに動かす（再生による回帰テスト・負荷テスト用）")
+    parser.add_argument("--profile-out", default="profile.json", help="終了時に計測結果を書き出すファイル（.json か .csv）")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    from scenes.title import HomeScene  # home_sceneに修正
-    run_game(HomeScene())
\ No newline at end of file
+    args = parse_args()
+    env_profile = os.environ.get("NOVEL_PROFILE", "")
+    overlay = args.profile_overlay or env_profile == "overlay"
+    profiler.configure(
+        enabled=args.profile or overlay or env_profile not in ("", "0"),
+        overlay=overlay,
+        dump_path=args.profile_out,
+    )
+    audio.configure(buffer=args.audio_buffer)
+    if args.headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+    fps = args.fps
+    options = {"window_size": args.resolution, "render_size": args.render_resolution, "scale_filter": args.scale}
+    if args.record:
+        options["recorder"] = InputRecorder(args.record)
+    if args.replay:
+        options["replayer"] = InputReplayer(args.replay, checksums=args.replay_checksums)
+        if args.replay_speed == "max":
+            fps = "uncapped"
+    if args.resume:
+        run_game(lambda: resume_game_scene(args.resume), fps=fps, **options)
+    else:
+        run_game(load_home_scene, fps=fps, **options)
\ No newline at end of file
@@ -1,37 +1,75 @@
 import pygame
 from base import SceneBase
-import json
 import os
+from collections import deque
+
+from utils.backlog_view import BacklogView
+from utils.button import draw_button, shadow_offset
+from utils.panel import get_panel
+from utils.stage import StageCompositor
+from utils.text_cache import TextRenderer
+from systems import assets
+from systems.display import Viewport, get_surface, get_viewport
+from systems.image_cache import BackgroundCache, SpriteCache
+from systems.preloader import AssetPreloader
+from systems.read_log import ReadLog, read_log_path
+from systems.save import AUTO_SLOT, QUICK_SLOT, SaveManager
+from systems.audio import CLICK_SE, audio
+from systems.backlog import Backlog
+from systems.resources import resources
+from systems.scenario import DEFAULT_SLOT, Choices, End, PlayBgm, PlaySe, Say, ScenarioStore, SetBg, SetChara, compile_scenario
+
+# bg=番号 と背景画像（assets/からのパス）の対応（tools/validate_scenario.py も参照する）
+BG_MAP = {
+    "1": "BG/Home.png",
+    "2": "BG/Forest.png",
+    "3": "BG/DemonKing.png",
+    "4": "BG/BadEnd.png",
+    "5": "BG/DustDemonKing.png",
+    "6": "BG/TrueEnd.png",
+    # 必要に応じて他の背景も追加可能
+}
+
+# 出てきた時点ですぐに適用してテキストへ進む命令
+IMMEDIATE_OPS = (SetBg, SetChara, PlayBgm, PlaySe)
 
-from utils.button import draw_button
 
 class GameScene(SceneBase):
-    def __init__(self):
+    def __init__(self, scenario_path=None):
         super().__init__()
-        self.screen = pygame.display.get_surface()
+        self.screen = get_surface()
         self.width, self.height = self.screen.get_size()
-        self.font = pygame.font.Font("assets/LightNovel.otf", 29)
+        # レイアウトは1920x1080基準の論理座標で書き、描画先の解像度に合わせて換算する
+        self.viewport = get_viewport(self.screen)
+        vp = self.viewport
+        self.font_key = ("font", "assets/LightNovel.otf", vp.length(29))
+        self.font = resources.font(*self.font_key[1:])  # フォントは共有の素材を借りる
+        self.text_renderer = TextRenderer(self.font)  # 文字ごとにラスタライズ結果をキャッシュ
         self.bg_color = (50, 50, 80)
-        self.bg_image = None  # 現在の背景画像
-        self.chara_image = None  # 現在の立ち絵
-        self.chara_info = None  # (kind, face_num)
-        self.bg_map = {
-            "1": "BG/Home.png",
-            "2": "BG/Forest.png",
-            "3": "BG/DemonKing.png",
-            "4": "BG/BadEnd.png",
-            "5": "BG/DustDemonKing.png",
-            "6": "BG/TrueEnd.png",
-            # 必要に応じて他の背景も追加可能
-        }
+        self.bg_id = None  # 現在の背景番号（セーブ用）
+        self.charas = {}  # 枠名 -> (kind, face_num, pos_num, z)（セーブ用）
+        # 背景と立ち絵を1枚に焼き込んでおくレイヤー（bg/cha命令の時だけ焼き直す）
+        self.stage = StageCompositor((self.width, self.height), self.bg_color)
+        self.bg_map = BG_MAP
+        # 画像のデコードはバックグラウンドで先読みしておく
+        self.preloader = AssetPreloader()
+        self.prefetch_limit = 8  # 一度に先読みの対象にする画像の数（キャッシュ済み・読み込み中も数える）
+        self.prefetch_depth = 2  # 先読みで選択肢をたどるチャプターの深さ
+        self.prefetch_window = 256  # 1回の先読みで見る命令の数（チャプターをまたいだ合計）
+        self.preload_lines_ahead = 0  # 現在のチャプターで画像の準備ができている行数
+        # 画面サイズに拡大縮小済みの背景キャッシュ（bg=適用時に一度だけ変換する）
+        self.bg_cache = BackgroundCache(self.bg_map, loader=self.preloader.load)
+        # 位置プリセットごとに拡大縮小済みの立ち絵キャッシュ
+        self.sprite_cache = SpriteCache(self.chara_layout, loader=self.preloader.load)
 
-        # シナリオデータの読み込み
-        scenario_path = os.path.join("scenarios", "episode1.json")
+        # シナリオデータの読み込み（コンパイル済みの命令列をチャプター単位で必要な分だけ読む）
+        if scenario_path is None:
+            scenario_path = os.path.join("scenarios", "episode1.json")
         try:
-            with open(scenario_path, encoding="utf-8") as f:
-                self.scenario = json.load(f)
+            self.scenario = ScenarioStore(scenario_path)
         except Exception as e:
-            self.scenario = {"0,0": ["0￥エラー$シナリオが読み込めませんでした。$改行"]}
+            print(f"Scenario load error: {e}")
+            self.scenario, _ = compile_scenario({"0,0": ["0￥エラー$シナリオが読み込めませんでした。$改行"]})
 
         # 最初のチャプター
         self.chapters = list(self.scenario.keys())
@@ -39,7 +77,7 @@ class GameScene(SceneBase):
         self.line_index = 0
         self.lines = self.scenario.get(self.chapter, [])
         self.history = []  # 表示履歴
-        self.max_history = 7
+        self.max_history = 7  # テキストウィンドウに出す最大行数（折り返した行も1行と数える）
         self.name_map = {"0": "", "1": "リオ", "2": "師匠", "3": "魔王", "4": "???"}
         # 名前ごとの色マップ
         self.name_color_map = {
@@ -50,324 +88,590 @@ class GameScene(SceneBase):
             "???": (180, 180, 255),
         }
 
-        self.text_window_rect = pygame.Rect(100, self.height - 350, self.width - 200, 300)
-        self.back_btn = pygame.Rect(50, 50, 150, 50)
+        self.text_window_rect = pygame.Rect(vp.length(100), self.height - vp.length(350), self.width - vp.length(200), vp.length(300))
+        self.back_btn = vp.rect(50, 50, 150, 50)
+
+        # バックログ（ホイール上かBキーで開く。表示した全行をリングバッファに残す）
+        self.backlog = Backlog()
+        self.backlog_view = BacklogView(
+            self.backlog, self.text_renderer, vp.rect(150, 120, 1600, 840),
+            self.font.get_height() + vp.length(10), self.name_map, self.name_color_map, vp.length(200), scale=vp.scale,
+        )
 
         # 追加: 選択肢表示フラグとボタン、選択肢リスト
         self.show_choices = False
         self.choice_buttons = []
         self.choices = []
 
-        self.text_display_index = 0  # 1行の何文字目まで表示するか
-        self.text_display_speed = 1  # 1フレームで何文字進めるか
+        self.text_display_index = 0  # 1行の何文字目まで表示するか（小数で進める）
+        self.text_display_speed = 60  # 1秒で何文字進めるか
         self.is_text_animating = False  # テキストアニメ中か
         self.last_text = None  # 現在アニメ中のテキスト
 
-        # クリック音のロード
-        self.click_sound = None
-        try:
-            self.click_sound = pygame.mixer.Sound(os.path.join("assets", "click.mp3"))
-        except Exception:
-            self.click_sound = None
-
-    def decode_scenario_line(self, line):
-        # choicesコマンド（分岐情報）をdictで受け取る
-        if isinstance(line, dict) and "choices" in line:
-            return [line]
-        # 背景切り替え命令（番号対応）
-        if line.startswith("bg="):
-            bg_id = line[3:].strip()
-            return [{"bg": bg_id}]
-        # 立ち絵切り替え命令（例: cha=girl,1,2 または cha=none）
-        if line.startswith("cha="):
-            try:
-                _, params = line.split("=", 1)
-                params = [x.strip() for x in params.split(",")]
-                # 立ち絵を消す命令
-                if params[0].lower() == "none":
-                    return [{"cha": ("none",)}]
-                if len(params) == 3:
-                    kind, face_num, pos_num = params
-                elif len(params) == 2:
-                    kind, face_num = params
-                    pos_num = "1"  # デフォルト位置
-                elif len(params) == 1:
-                    kind = params[0]
-                    face_num = "1"
-                    pos_num = "1"
-                else:
-                    return []
-                return [{"cha": (kind, face_num, pos_num)}]
-            except Exception:
-                return []
-        # 例: "2よし、公園で食べちゃお。$覚めるともったいないし。"
-        if not line:
-            return []
-        
-        #１終了フラグ
-        if line == "end":
-            return [{"end": True}]
-        
-        name_num = line[0]
-        text = line[1:]
-        name = self.name_map.get(name_num, "")
-        # $で分割して複数行対応。2行目以降は名前なし
-        lines = text.split("$")
-        result = []
-        for idx, l in enumerate(lines):
-            l = l.strip()
-            if l:
-                if idx == 0:
-                    result.append({"name": name, "text": l})
-                else:
-                    result.append({"name": "", "text": l})
-        return result
+        # スキップ（Ctrlを押している間は全部、Sキーで既読だけ）
+        self.read_log = ReadLog(read_log_path(scenario_path))
+        self.skip_held = False
+        self.skip_read = False
+        self.skip_lines_per_step = 200  # 1ステップ（1/60秒）で読み飛ばす最大行数
+
+        # セーブ（チャプター移動時に自動セーブ、F5でクイックセーブ、F9でクイックロード）
+        self.saves = SaveManager(scenario_path)
+        self.shown_line = None  # 画面に出ているSay/Choices命令の行番号
+
+        # 切り替え演出の秒数（背景の切り替え、チャプター移動、タイトルへ戻る時）
+        self.bg_transition_time = 0.5
+        self.chapter_transition_time = 0.6
+        self.leave_transition_time = 0.5
+
+        # クリック音（デコード済みの音を全シーンで共有する）
+        self.click_sound = resources.sound(CLICK_SE)
+
+        self.prefetch()
+
+    def apply_command(self, op):
+        """bg/cha/bgm/se命令を即時適用する"""
+        if isinstance(op, PlayBgm):
+            audio.play_bgm(op.path)
+        elif isinstance(op, PlaySe):
+            audio.play_se(op.path)
+        else:
+            self.apply_visual_command(op)
+
+    def apply_visual_command(self, op):
+        """bg/cha命令を即時適用する"""
+        if isinstance(op, SetBg):
+            bg_image = self.bg_cache.get(op.bg_id, (self.width, self.height))
+            if bg_image is not None:
+                # bg_imageはキャッシュ側で画面サイズ・画面フォーマットに変換済み
+                self.stage.set_background(bg_image)
+                self.bg_id = op.bg_id
+                self.dirty.mark_all()
+        elif isinstance(op, SetChara):
+            self.dirty.mark_all()
+            if op.slot is None:
+                # cha=none は全部の立ち絵を消す
+                self.stage.clear_sprites()
+                self.charas.clear()
+                return
+            entry = None
+            if op.kind is not None:
+                # 立ち絵はキャッシュ側で位置プリセットに合わせて拡大縮小済み
+                entry = self.sprite_cache.get(op.kind, op.face_num, op.pos_num, (self.width, self.height))
+            if entry is None:
+                self.stage.remove_sprite(op.slot)
+                self.charas.pop(op.slot, None)
+            else:
+                surface, pos = entry
+                self.stage.set_sprite(op.slot, surface, pos, op.z)
+                self.charas[op.slot] = (op.kind, op.face_num, op.pos_num, op.z)
+
+    def chara_layout(self, chara_size, pos_num, screen_size):
+        """位置番号から立ち絵の (幅, 高さ, x, y) を求める"""
+        chara_w, chara_h = chara_size
+        width, height = screen_size
+        if pos_num == "2":  # 中央
+            scale = (height * 1.00) / chara_h
+        elif pos_num == "3":  # 左端
+            scale = (height * 0.90) / chara_h
+        else:  # "1"（右端）と未知の番号
+            scale = (height * 0.85) / chara_h
+        new_w = int(chara_w * scale)
+        new_h = int(chara_h * scale)
+        margin = Viewport(screen_size).length(40)
+        if pos_num == "2":
+            x = (width - new_w) // 2
+        elif pos_num == "3":
+            x = margin
+        else:
+            x = width - new_w - margin
+        y = height - new_h
+        return new_w, new_h, x, y
+
+    def prefetch(self):
+        """
+        現在位置より先と、choicesで到達できるチャプター（prefetch_depth段まで）の bg/cha 画像を近い順に先読み予約する。
+        見るのは合わせて prefetch_window 命令までで、画像が prefetch_limit 枚見つかった所（キャッシュ済み・読み込み中も数える）でやめる
+        （クリックのたびに呼ぶので、長いチャプターでも最後まで走査しない）。
+        """
+        size = (self.width, self.height)
+        found = set()
+        budget = self.prefetch_window
+        lines_ahead = None
+        queue = deque([(self.chapter, self.line_index, 0)])
+        seen = {self.chapter}
+        while queue and budget > 0 and len(found) < self.prefetch_limit:
+            key, start, depth = queue.popleft()
+            lines = self.scenario.get(key, [])
+            scanned = min(len(lines) - start, budget)
+            for offset in range(scanned):
+                op = lines[start + offset]
+                path = None
+                if isinstance(op, SetBg):
+                    path = self.bg_cache.path_for(op.bg_id)
+                    image_key = op.bg_id
+                    cached = self.bg_cache.is_cached(op.bg_id, size)
+                elif isinstance(op, SetChara) and op.kind is not None:
+                    path = self.sprite_cache.path_for(op.kind, op.face_num)
+                    image_key = (op.kind, op.face_num, op.pos_num)
+                    cached = self.sprite_cache.is_cached(op.kind, op.face_num, op.pos_num, size)
+                elif isinstance(op, PlaySe):
+                    # 効果音は画像とは別に、音声のスレッドでデコードしておく
+                    audio.preload(op.path)
+                elif isinstance(op, Choices) and depth < self.prefetch_depth:
+                    for _, jump_key in op.choices:
+                        if jump_key in self.scenario and jump_key not in seen:
+                            seen.add(jump_key)
+                            queue.append((jump_key, 0, depth + 1))
+                if not path or image_key in found:
+                    continue
+                found.add(image_key)
+                if not cached and not self.preloader.is_ready(path):
+                    # 読み込み中のものはそのまま待つ（ファイルの有無を毎回調べない）
+                    if self.preloader.is_pending(path) or assets.exists(path):
+                        if key == self.chapter and lines_ahead is None:
+                            lines_ahead = offset
+                        self.preloader.request(path)
+                if len(found) >= self.prefetch_limit:
+                    scanned = offset + 1
+                    break
+            budget -= scanned
+            if key == self.chapter and lines_ahead is None:
+                lines_ahead = scanned
+        self.preload_lines_ahead = lines_ahead if lines_ahead is not None else 0
+
+    def on_suspend(self):
+        # タイトルに戻るときは既読だけ保存する（先読みやキャッシュはまた始めた時のために残す）
+        self.skip_read = False
+        self.read_log.save(self.saves.write)
+
+    def on_resume(self):
+        """タイトルからもう一度始めた時は、読み込み済みの素材はそのままで最初のチャプターの頭に戻す"""
+        if self.chapters:
+            self.restore({"chapter": self.chapters[0], "line": 0})
+
+    def on_quit(self):
+        # 既読は自動セーブと同じスレッドに積んで、書きかけの分も含めて書き終えてから終わる
+        self.read_log.save(self.saves.write)
+        self.saves.flush()
+
+    def dispose(self):
+        # 先読みを止め、既読を保存して共有の素材を返す（書きかけのセーブは書き終えてから抜ける）
+        # 終了時にatexitから呼ばれることもあり、その時はもうスレッドに書き込みを積めないので既読はここで直接書く
+        self.preloader.shutdown()
+        self.saves.shutdown()
+        self.read_log.save()
+        if isinstance(self.scenario, ScenarioStore):
+            self.scenario.close()
+        resources.release(self.font_key)
+        resources.release(("sound", self.click_sound))
+
+    def begin_transition(self, kind, duration, on_done=None):
+        """切り替え演出を始める（スキップ中や演出中なら演出せず、on_doneだけすぐ呼ぶ）"""
+        if self.skip_held or self.skip_read or self.transition.active:
+            if on_done is not None:
+                on_done()
+            return
+        self.transition.start(self.screen, kind, duration, on_done)
+        self.dirty.mark_all()
+
+    def leave_to_title(self):
+        """暗転してからタイトルに戻る"""
+        from scenes.title import HomeScene
+        self.begin_transition("out", self.leave_transition_time, lambda: self.switch_to_scene(HomeScene))
 
     def jump_to_chapter(self, chapter_key):
         # 分岐先のチャプターにジャンプ
         if chapter_key in self.scenario:
+            self.begin_transition("fade", self.chapter_transition_time)
             self.chapter = chapter_key
             self.lines = self.scenario[chapter_key]
             self.line_index = 0
             self.history = []
-            self.chara_image = None
-            self.chara_info = None
-            # チャプター開始時にbg/cha命令をすべて即時適用し、最初のテキスト行からクリックで進む
+            self.shown_line = None
+            self.apply_visual_command(SetChara(None, slot=None))
+            # チャプター開始時にbg/cha/bgm/se命令をすべて即時適用し、最初のテキスト行からクリックで進む
             while self.line_index < len(self.lines):
-                parsed_lines = self.decode_scenario_line(self.lines[self.line_index])
-                if len(parsed_lines) == 1 and ("bg" in parsed_lines[0] or "cha" in parsed_lines[0]):
-                    if "bg" in parsed_lines[0]:
-                        bg_id = parsed_lines[0]["bg"]
-                        bg_file = self.bg_map.get(bg_id)
-                        if bg_file:
-                            bg_path = os.path.join("assets", bg_file)
-                            if os.path.exists(bg_path):
-                                self.bg_image = pygame.image.load(bg_path)
-                    elif "cha" in parsed_lines[0]:
-                        cha_info = parsed_lines[0]["cha"]
-                        if cha_info[0] == "none":
-                            self.chara_image = None
-                            self.chara_info = None
-                        else:
-                            kind = cha_info[0]
-                            face_num = cha_info[1] if len(cha_info) > 1 else "1"
-                            pos_num = cha_info[2] if len(cha_info) > 2 else "1"
-                            img_path = os.path.join("assets", "Cha", kind, f"{face_num}.png")
-                            if os.path.exists(img_path):
-                                self.chara_image = pygame.image.load(img_path)
-                                self.chara_info = (kind, face_num, pos_num)
-                            else:
-                                self.chara_image = None
-                                self.chara_info = None
+                op = self.lines[self.line_index]
+                if isinstance(op, IMMEDIATE_OPS):
+                    self.apply_command(op)
                     self.line_index += 1
                 else:
                     break
+            self.prefetch()
+            # 自動セーブ（ファイルへの書き込みは別スレッド）
+            self.read_log.save(self.saves.write)
+            self.saves.save(AUTO_SLOT, self.snapshot())
 
     def process_input(self, events, keys):
+        # Ctrlを押している間は未読も含めてスキップ
+        self.skip_held = bool(keys[pygame.K_LCTRL] or keys[pygame.K_RCTRL])
+        # 切り替え演出中のクリック・キーは演出が終わってから処理する
+        events = self.transition.filter(events)
         for event in events:
             if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                self.on_quit()
                 pygame.quit()
                 exit()
+            if self.backlog_view.is_open:
+                if not self.backlog_view.handle_event(event):
+                    self.backlog_view.close()
+                self.dirty.mark_all()
+                continue
+            if (event.type == pygame.MOUSEWHEEL and event.y > 0) or (event.type == pygame.KEYDOWN and event.key == pygame.K_b):
+                self.open_backlog()
+                continue
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_s:
+                # Sキーで既読スキップの切り替え
+                self.skip_read = not self.skip_read
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F5:
+                self.save_game(QUICK_SLOT)
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F9:
+                self.load_game(QUICK_SLOT)
+                return
+            if event.type == pygame.MOUSEMOTION:
+                self.dirty.track_hover("back", self.back_btn, event.pos, shadow_offset(self.viewport.scale))
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if self.back_btn.collidepoint(event.pos):
-                    from scenes.title import HomeScene
-                    self.switch_to_scene(HomeScene())
+                    self.leave_to_title()
+                    return
                 elif self.show_choices:
                     for idx, btn in enumerate(self.choice_buttons):
                         if btn.collidepoint(event.pos):
                             if 0 <= idx < len(self.choices):
-                                jump_key = self.choices[idx]["jump"]
+                                jump_key = self.choices[idx][1]
                                 self.jump_to_chapter(jump_key)
                                 self.show_choices = False
                                 return
                 elif self.text_window_rect.collidepoint(event.pos):
+                    self.dirty.mark(self.text_window_rect)
                     # クリック音を再生
-                    if self.click_sound:
-                        self.click_sound.play()
+                    audio.play_se(self.click_sound)
                     # テキストアニメ中なら全文即表示、全文表示済みなら次へ
                     if self.is_text_animating:
                         self.text_display_index = len(self.last_text)
                         self.is_text_animating = False
                         return
-                    # bg/cha/choices以外のテキストのみクリックで進める
-                    while self.line_index < len(self.lines):
-                        parsed_lines = self.decode_scenario_line(self.lines[self.line_index])
-                        
-                        if len(parsed_lines) == 1 and "end" in parsed_lines[0]:
-                            from scenes.title import HomeScene
-                            self.switch_to_scene(HomeScene())
-                            return
-                        
-                        if len(parsed_lines) == 1 and isinstance(parsed_lines[0], dict) and "choices" in parsed_lines[0]:
-                            self.choices = parsed_lines[0]["choices"]
-                            self.show_choices = True
-                            self.line_index += 1
-                            return
-                        if len(parsed_lines) == 1 and ("bg" in parsed_lines[0] or "cha" in parsed_lines[0]):
-                            # bg/cha命令はスキップ（jump_to_chapterで既に適用済み or 途中で出てきた場合も即時適用してスキップ）
-                            if "bg" in parsed_lines[0]:
-                                bg_id = parsed_lines[0]["bg"]
-                                bg_file = self.bg_map.get(bg_id)
-                                if bg_file:
-                                    bg_path = os.path.join("assets", bg_file)
-                                    if os.path.exists(bg_path):
-                                        self.bg_image = pygame.image.load(bg_path)
-                            elif "cha" in parsed_lines[0]:
-                                cha_info = parsed_lines[0]["cha"]
-                                if cha_info[0] == "none":
-                                    self.chara_image = None
-                                    self.chara_info = None
-                                else:
-                                    kind = cha_info[0]
-                                    face_num = cha_info[1] if len(cha_info) > 1 else "1"
-                                    pos_num = cha_info[2] if len(cha_info) > 2 else "1"
-                                    img_path = os.path.join("assets", "Cha", kind, f"{face_num}.png")
-                                    if os.path.exists(img_path):
-                                        self.chara_image = pygame.image.load(img_path)
-                                        self.chara_info = (kind, face_num, pos_num)
-                                    else:
-                                        self.chara_image = None
-                                        self.chara_info = None
-                            self.line_index += 1
-                            continue
-                        else:
-                            # テキストアニメ開始
-                            self.history = []
-                            self.history.extend(parsed_lines)
-                            if self.history:
-                                self.text_display_index = 0
-                                self.is_text_animating = True
-                                self.last_text = self.history[-1]["text"]
-                            self.line_index += 1
-                            return
-
-    def update(self):
+                    self.advance()
+                    return
+
+    def advance(self):
+        """次のテキスト行（またはchoices・end）まで進める"""
+        # bg/cha/choices以外のテキストのみクリックで進める
+        while self.line_index < len(self.lines):
+            op = self.lines[self.line_index]
+
+            if isinstance(op, End):
+                self.leave_to_title()
+                return
+
+            if isinstance(op, Choices):
+                self.open_choices(op)
+                self.line_index += 1
+                return
+            if isinstance(op, IMMEDIATE_OPS):
+                # bg/cha/bgm/se命令はスキップ（jump_to_chapterで既に適用済み or 途中で出てきた場合も即時適用してスキップ）
+                if isinstance(op, SetBg):
+                    # 背景の切り替えは前の画面から重ねながら
+                    self.begin_transition("crossfade", self.bg_transition_time)
+                self.apply_command(op)
+                self.line_index += 1
+                continue
+            else:
+                # テキストアニメ開始（2行目以降は名前なし）
+                self.show_text(op)
+                self.line_index += 1
+                self.prefetch()
+                return
+
+    def open_choices(self, op):
+        """Choices命令の選択肢を表示する"""
+        self.choices = op.choices
+        self.choice_buttons = self.layout_choices(len(self.choices))
+        self.show_choices = True
+        self.shown_line = self.line_index
+        self.dirty.mark_all()
+
+    def show_text(self, op, animate=True, log=True):
+        """Say命令をテキストウィンドウに表示し、既読にする（logならバックログにも残す）"""
+        self.read_log.mark(self.chapter, self.line_index)
+        if log:
+            for name_id, text in op.entries:
+                self.backlog.append(name_id, text)
+        self.shown_line = self.line_index
+        self.history = [
+            {"name": self.name_map.get(name_id, ""), "text": text}
+            for name_id, text in op.entries
+        ]
+        self.is_text_animating = False
+        if self.history:
+            self.last_text = self.history[-1]["text"]
+            if animate:
+                self.text_display_index = 0
+                self.is_text_animating = True
+            else:
+                self.text_display_index = len(self.last_text)
+        self.dirty.mark(self.text_window_rect)
+
+    def skip_lines(self, limit, read_only):
+        """
+        テキストを最大limit行まで描画せずに読み飛ばし、止まった理由を返す（"limit", "choices", "unread", "end"）。
+        途中のbg/bgmは最後の状態、chaは枠ごとの最後の状態だけを適用し、効果音は鳴らさない。read_onlyなら未読の行の手前で止まる。
+        choices・endの処理と未読の行の表示は通常のadvanceに任せる。
+        """
+        last_bg = None
+        last_charas = {}  # 枠名 -> 最後のcha命令
+        clear_charas = False  # 途中にcha=none（全部消す）があったか
+        last_bgm = None
+        last_say = None
+        say_index = 0
+        reason = "limit"
+        skipped = 0
+        while skipped < limit:
+            if self.line_index >= len(self.lines):
+                reason = "end"
+                break
+            op = self.lines[self.line_index]
+            if isinstance(op, SetBg):
+                last_bg = op
+            elif isinstance(op, SetChara):
+                if op.slot is None:
+                    last_charas.clear()
+                    clear_charas = True
+                else:
+                    last_charas[op.slot] = op
+            elif isinstance(op, PlayBgm):
+                last_bgm = op
+            elif isinstance(op, PlaySe):
+                pass
+            elif isinstance(op, Say):
+                if read_only and not self.read_log.is_read(self.chapter, self.line_index):
+                    reason = "unread"
+                    break
+                self.read_log.mark(self.chapter, self.line_index)
+                for name_id, text in op.entries:
+                    self.backlog.append(name_id, text)
+                last_say = op
+                say_index = self.line_index
+                skipped += 1
+            else:
+                reason = "choices" if isinstance(op, Choices) else "end"
+                break
+            self.line_index += 1
+
+        if last_bg is not None:
+            self.apply_visual_command(last_bg)
+        if clear_charas:
+            self.apply_visual_command(SetChara(None, slot=None))
+        for op in last_charas.values():
+            self.apply_visual_command(op)
+        if last_bgm is not None:
+            audio.play_bgm(last_bgm.path)
+        if last_say is not None:
+            resume = self.line_index
+            self.line_index = say_index
+            self.show_text(last_say, animate=False, log=False)
+            self.line_index = resume
+        if skipped:
+            self.prefetch()
+        return reason
+
+    def snapshot(self):
+        """今の状態をセーブ用の小さなdictにする（画像や履歴は持たず、命令の位置と見た目の番号だけ）"""
+        return {
+            "chapter": self.chapter,
+            "line": self.line_index,
+            "shown": self.shown_line,
+            "bg": self.bg_id,
+            "charas": [[slot, *info] for slot, info in self.charas.items()],
+            "bgm": audio.current_bgm,
+        }
+
+    def restore(self, snapshot):
+        """
+        スナップショットから状態を作り直す。それまでの行は再生せず、
+        背景・立ち絵と画面に出ていたテキスト（または選択肢）だけを直接表示する。
+        """
+        key = snapshot.get("chapter")
+        if key not in self.scenario:
+            return False
+        self.chapter = key
+        self.lines = self.scenario[key]
+        self.line_index = max(0, min(int(snapshot.get("line", 0)), len(self.lines)))
+        self.history = []
+        self.backlog.clear()
+        self.backlog_view.close()
+        self.transition.cancel()
+        self.shown_line = None
+        self.show_choices = False
+        self.choices = []
+        self.choice_buttons = []
+        self.is_text_animating = False
+        self.stage.set_background(None)
+        self.bg_id = None
+        if snapshot.get("bg") is not None:
+            self.apply_visual_command(SetBg(snapshot["bg"]))
+        self.apply_visual_command(SetChara(None, slot=None))
+        charas = snapshot.get("charas")
+        if charas is None and snapshot.get("chara"):
+            # 立ち絵が1枚だけだった頃のセーブ
+            charas = [[DEFAULT_SLOT, *snapshot["chara"], 0]]
+        for slot, kind, face_num, pos_num, z in charas or ():
+            self.apply_visual_command(SetChara(kind, face_num, pos_num, slot, z))
+        if "bgm" in snapshot:
+            audio.play_bgm(snapshot["bgm"])
+
+        shown = snapshot.get("shown")
+        if shown is not None and 0 <= shown < len(self.lines):
+            op = self.lines[shown]
+            resume = self.line_index
+            self.line_index = shown
+            if isinstance(op, Say):
+                self.show_text(op, animate=False)
+            elif isinstance(op, Choices):
+                self.open_choices(op)
+            self.line_index = resume
+        self.dirty.mark_all()
+        self.prefetch()
+        return True
+
+    def save_game(self, slot):
+        self.read_log.save(self.saves.write)
+        self.saves.save(slot, self.snapshot())
+
+    def load_game(self, slot):
+        """スロットから再開する（セーブが無ければFalse）"""
+        snapshot = self.saves.load(slot)
+        if snapshot is None or not self.restore(snapshot):
+            return False
+        return True
+
+    def update_skip(self):
+        """スキップ中なら1ステップ分の行を読み飛ばす"""
+        if not (self.skip_held or self.skip_read) or self.show_choices:
+            return
+        self.is_text_animating = False
+        reason = self.skip_lines(self.skip_lines_per_step, read_only=not self.skip_held)
+        if reason == "limit":
+            return
+        # 選択肢・未読・シナリオの終わりでは止まる（既読スキップは解除する）
+        self.skip_read = False
+        if reason == "choices":
+            self.advance()
+
+    def update(self, dt):
+        # 先読みが終わった画像を受け取る
+        self.preloader.pump()
+        if self.transition.update(dt):
+            self.dirty.mark_all()
+        if self.backlog_view.is_open:
+            return
+        if not self.transition.active:
+            self.update_skip()
         # テキストアニメーション進行
         if self.is_text_animating and self.last_text is not None:
-            self.text_display_index += self.text_display_speed
+            self.dirty.mark(self.text_window_rect)
+            self.text_display_index += self.text_display_speed * dt
             if self.text_display_index >= len(self.last_text):
                 self.text_display_index = len(self.last_text)
                 self.is_text_animating = False
 
     def render(self, screen):
-        # 背景描画
-        if self.bg_image:
-            screen.blit(pygame.transform.scale(self.bg_image, (self.width, self.height)), (0, 0))
-        else:
-            screen.fill(self.bg_color)
-        # 立ち絵描画（位置・拡大率プリセット対応）
-        if self.chara_image and self.chara_info:
-            chara_w, chara_h = self.chara_image.get_size()
-            pos_num = str(self.chara_info[2]) if len(self.chara_info) > 2 else "1"
-            if pos_num == "1":  # 右端
-                scale = (self.height * 0.85) / chara_h
-                new_w = int(chara_w * scale)
-                new_h = int(chara_h * scale)
-                x = self.width - new_w - 40
-                y = self.height - new_h
-            elif pos_num == "2":  # 中央
-                scale = (self.height * 1.00) / chara_h
-                new_w = int(chara_w * scale)
-                new_h = int(chara_h * scale)
-                x = (self.width - new_w) // 2
-                y = self.height - new_h
-            elif pos_num == "3":  # 左端
-                scale = (self.height * 0.90) / chara_h
-                new_w = int(chara_w * scale)
-                new_h = int(chara_h * scale)
-                x = 40
-                y = self.height - new_h
-            else:
-                scale = (self.height * 0.85) / chara_h
-                new_w = int(chara_w * scale)
-                new_h = int(chara_h * scale)
-                x = self.width - new_w - 40
-                y = self.height - new_h
-            chara_img = pygame.transform.scale(self.chara_image, (new_w, new_h))
-            screen.blit(chara_img, (x, y))
+        # 差分描画モードで変化が無ければ何も描かない
+        if not self.dirty.is_dirty():
+            return
+        screen.set_clip(self.dirty.clip_rect())
+
+        if self.backlog_view.is_open:
+            self.backlog_view.render(screen)
+            screen.set_clip(None)
+            return
+
+        self.render_stage(screen)
 
         # --- 半透明テキストウィンドウ ---
-        text_surf = pygame.Surface((self.text_window_rect.width, self.text_window_rect.height), pygame.SRCALPHA)
-        text_surf.fill((30, 30, 30, 180))  # RGBA: 180は透明度（0=完全透明, 255=不透明）
-        pygame.draw.rect(text_surf, (200, 200, 200, 220), text_surf.get_rect(), 3, border_radius=15)
-        screen.blit(text_surf, (self.text_window_rect.x, self.text_window_rect.y))
-
-        # テキスト描画部分
-        line_height = self.font.get_height() + 10
-        start = max(0, len(self.history) - self.max_history)
-        y = self.text_window_rect.y + 30
-        for i, entry in enumerate(self.history[start:]):
+        # RGBA: 180は透明度（0=完全透明, 255=不透明）。画像は作り置きを使う
+        vp = self.viewport
+        text_surf = get_panel(self.text_window_rect.size, (30, 30, 30, 180), (200, 200, 200, 220), vp.length(3), border_radius=vp.length(15), fill_radius=0)
+        screen.blit(text_surf, self.text_window_rect.topleft)
+
+        # テキスト描画部分（ウィンドウの幅で折り返す。折り返しの結果はtext_rendererがキャッシュしている）
+        line_height = self.font.get_height() + vp.length(10)
+        margin = vp.length(30)
+        text_x = self.text_window_rect.x + margin
+        text_width = self.text_window_rect.width - margin * 2
+        max_rows = max(1, min(self.max_history, (self.text_window_rect.height - margin) // line_height))
+        last = len(self.history) - 1
+        reveal = int(self.text_display_index)
+        rows = []  # (名前, 名前の幅, 行, 表示する文字数, タイプライター中か)
+        for i, entry in enumerate(self.history):
             name = entry["name"]
-            text = entry["text"]
-            # ノベルゲー風：一番下の行だけタイプライター演出
-            if i == len(self.history[start:]) - 1 and self.is_text_animating:
-                display_text = text[:self.text_display_index]
-            else:
-                display_text = text
-            # 名前がある場合は色付きで表示
+            indent = 0
+            if name:
+                # 名前がある場合は色付きで表示し、本文は名前の右隣から
+                indent = self.text_renderer.render(name, self.name_color_map.get(name, (255, 255, 255))).get_width() + vp.length(10)
+            animating = i == last and self.is_text_animating
+            for start, line in self.text_renderer.layout(entry["text"], text_width - indent):
+                visible = len(line)
+                if animating:
+                    # 一番下の文だけタイプライター演出。折り返した行ごとに見えている文字数を出す
+                    visible = max(0, min(visible, reveal - start))
+                    if visible == 0 and line:
+                        break
+                rows.append((name if start == 0 else "", indent, line, visible, animating))
+        y = self.text_window_rect.y + margin
+        for name, indent, line, visible, animating in rows[-max_rows:]:
             if name:
-                name_color = self.name_color_map.get(name, (255,255,255))
-                name_surface = self.font.render(name, True, name_color)
-                screen.blit(name_surface, (self.text_window_rect.x + 30, y))
-                name_w = name_surface.get_width()
-                # テキストは白で名前の右隣に表示
-                text_surface = self.font.render(display_text, True, (255,255,255))
-                screen.blit(text_surface, (self.text_window_rect.x + 30 + name_w + 10, y))
+                screen.blit(self.text_renderer.render(name, self.name_color_map.get(name, (255, 255, 255))), (text_x, y))
+            if animating:
+                # 増えた文字だけ描き足す（表示しきった行はキャッシュから）
+                text_surface = self.text_renderer.render_prefix(line, (255, 255, 255), visible)
             else:
-                text_surface = self.font.render(display_text, True, (255,255,255))
-                screen.blit(text_surface, (self.text_window_rect.x + 30, y))
+                text_surface = self.text_renderer.render(line, (255, 255, 255))
+            screen.blit(text_surface, (text_x + indent, y))
             y += line_height
 
-        # 選択肢ボタン
-        self.choice_buttons = []
+        # 選択肢ボタン（位置は選択肢が出た時にlayout_choicesで決めてある）
         if self.show_choices and self.choices:
-            btn_w, btn_h = 350, 60
-            gap = 25
-            num = len(self.choices)
-            total_height = num * btn_h + (num - 1) * gap
-            start_y = (self.height - total_height) // 2
-            for idx, choice in enumerate(self.choices):
-                label = choice.get("label", f"選択肢{idx+1}")
-                x = (self.width - btn_w) // 2
-                y = start_y + idx * (btn_h + gap)
-                btn_rect = pygame.Rect(x, y, btn_w, btn_h)
-
-                # 角丸の半透明ボタン本体
-                btn_surf = pygame.Surface((btn_w, btn_h), pygame.SRCALPHA)
-                # 角丸で塗りつぶし
-                pygame.draw.rect(btn_surf, (20, 20, 20, 180), btn_surf.get_rect(), border_radius=18)
-                # 角丸で白枠
-                pygame.draw.rect(btn_surf, (255, 255, 255, 180), btn_surf.get_rect(), 2, border_radius=18)
-                screen.blit(btn_surf, (x, y))
+            for btn_rect, (label, _) in zip(self.choice_buttons, self.choices):
+                # 角丸の半透明ボタン本体と白枠（作り置き）
+                btn_surf = get_panel(btn_rect.size, (20, 20, 20, 180), (255, 255, 255, 180), vp.length(2), border_radius=vp.length(18))
+                screen.blit(btn_surf, btn_rect.topleft)
 
                 # テキストはやや大きめ＆中央
-                text_surface = self.font.render(label, True, (255, 255, 255))
-                text_x = x + (btn_w - text_surface.get_width()) // 2
-                text_y = y + (btn_h - text_surface.get_height()) // 2
+                text_surface = self.text_renderer.render(label, (255, 255, 255))
+                text_x = btn_rect.x + (btn_rect.width - text_surface.get_width()) // 2
+                text_y = btn_rect.y + (btn_rect.height - text_surface.get_height()) // 2
                 screen.blit(text_surface, (text_x, text_y))
-                self.choice_buttons.append(btn_rect)
         # 戻るボタン
         #pygame.draw.rect(screen, (200, 50, 50), self.back_btn)
         #back_text = self.font.render("Back", True, (255, 255, 255))
         #screen.blit(back_text, (self.back_btn.x + 25, self.back_btn.y + 10))
         
         # 戻るボタン（draw_buttonで描画）
-        self.back_btn = draw_button(screen, "Back", (self.back_btn.x, self.back_btn.y), 48, (200, 50, 50), (255, 255, 255))
-
-        pygame.display.flip()
-
-    def _wrap_text(self, text, font, max_width):
-        words = text.split(' ')
-        lines = []
-        current_line = ""
-        for word in words:
-            test_line = current_line + (" " if current_line else "") + word
-            if font.size(test_line)[0] <= max_width:
-                current_line = test_line
-            else:
-                if current_line:
-                    lines.append(current_line)
-                current_line = word
-        if current_line:
-            lines.append(current_line)
-        return lines
\ No newline at end of file
+        self.back_btn = draw_button(screen, "Back", (self.back_btn.x, self.back_btn.y), vp.length(48), (200, 50, 50), (255, 255, 255), scale=vp.scale)
+
+        # 切り替え演出中なら前の画面や黒を重ねる
+        self.transition.draw(screen)
+        screen.set_clip(None)
+
+    def render_stage(self, screen):
+        """背景と立ち絵を描く（焼き込み済みの1枚をblitするだけ）"""
+        self.stage.draw(screen)
+
+    def open_backlog(self):
+        """背景と立ち絵だけを描いた画面を下敷きにしてバックログを開く"""
+        self.skip_read = False
+        stage = pygame.Surface(self.screen.get_size()).convert(self.screen)
+        self.render_stage(stage)
+        self.backlog_view.open(stage)
+        self.dirty.mark_all()
+
+    def layout_choices(self, num):
+        """選択肢num個分のボタンの矩形を画面中央に縦に並べて返す"""
+        vp = self.viewport
+        btn_w, btn_h = vp.point(350, 60)
+        gap = vp.length(25)
+        total_height = num * btn_h + (num - 1) * gap
+        start_y = (self.height - total_height) // 2
+        x = (self.width - btn_w) // 2
+        return [pygame.Rect(x, start_y + idx * (btn_h + gap), btn_w, btn_h) for idx in range(num)]
@@ -1,64 +1,86 @@
 import pygame
 from base import SceneBase
-from utils.button import draw_button, is_button_clicked
+from utils.button import draw_button, is_button_clicked, shadow_offset
+from systems.audio import CLICK_SE, audio
+from systems.display import LOGICAL_SIZE, get_surface, get_viewport
 from systems.volumes import VolumeManager
+from systems.preloader import AssetPreloader
+from systems.resources import resources
+from systems.startup import startup
 
+BG_PATH = "assets/BG/Home.png"
+TITLE_BGM = "assets/MusicBox_08.mp3"
+_music_started = False
 
 
-
-# 音楽初期化
-pygame.mixer.init()
-pygame.mixer.music.load("assets/MusicBox_08.mp3")
-pygame.mixer.music.set_volume(0)
-pygame.mixer.music.play(-1)
-
-
+def start_music():
+    """タイトルBGMを流す（import時ではなくタイトル画面の準備ができた時。ゲームから戻った時も曲を戻す）"""
+    global _music_started
+    if not _music_started:
+        _music_started = True
+        # 最初は音量0（Volume Upで上げる）
+        audio.set_volume("bgm", 0)
+        # ゲーム画面のクリック音も今のうちにデコードしておく
+        audio.preload(CLICK_SE)
+    audio.play_bgm(TITLE_BGM)
 
 
 class HomeScene(SceneBase):
     def __init__(self):
         super().__init__()
         # 初期化処理
-        self.screen = pygame.display.set_mode((1920, 1080))
+        # run_gameが作った画面があればそれを使う（作り直すとvsync等の設定が消える）
+        self.screen = get_surface() or pygame.display.set_mode(LOGICAL_SIZE)
         pygame.font.init()
-        self.clock = pygame.time.Clock()
         self.width, self.height = self.screen.get_size()
+        self.viewport = get_viewport(self.screen)  # 1920x1080基準の座標を描画先の解像度に換算する
         
-        # フラグとデバッグ用変数
-        self.fade_completed = False
+        # デバッグ用変数
         self.debug_info = ""  # デバッグ情報
 
-        # リソース読み込み
-        self.bg = pygame.image.load("assets/BG/Home.png")
-        self.bg = pygame.transform.scale(self.bg, (self.width, self.height))
-        self.home_girl = pygame.image.load("assets/Cha/character1/1.png")
-        self.title_font = pygame.font.Font("assets/LightNovel.otf", 150)
-        self.debug_font = pygame.font.Font(None, 30)  # デバッグ用フォント
-        self.title_text = self.title_font.render("魔王戦まで3日", True, (255, 255, 255),)
-
-        # キャラリサイズ
-        scale = 0.8
-        ow, oh = self.home_girl.get_size()
-        self.home_girl = pygame.transform.scale(self.home_girl, (int(ow * scale), int(oh * scale)))
-
-        
+        # リソース読み込み（背景のデコードは別スレッドで行い、その間は真っ黒な画面を出す）
+        self.assets_ready = False
+        self.bg = None
+        self.title_text = None
+        self.debug_font = resources.font(None, self.viewport.length(30))  # デバッグ用フォント
+        self.preloader = AssetPreloader(max_workers=1)
+        self.preloader.request(BG_PATH)
 
         self.volume_manager = VolumeManager()
         
         # ボタン初期化
         self.setup_buttons()
         
-        # フェード処理用
-        self.fade_alpha = 255  # フェード用アルファ値
-        self.fade_speed = 10
+        # フェードイン（黒から）にかける秒数
+        self.fade_in_time = 0.4
+
+    def load_assets(self):
+        """先読みが終わった素材から描画用の画像・文字を作る"""
+        # 画面サイズに拡大した背景は共有の素材として持つ
+        size = (self.width, self.height)
+        self.bg = resources.acquire(
+            ("image", BG_PATH, size),
+            lambda: pygame.transform.scale(self.preloader.load(BG_PATH).convert(), size),
+        )
+        self.preloader.shutdown()
+        self.title_font = resources.font("assets/LightNovel.otf", self.viewport.length(150))
+        self.title_text = self.title_font.render("魔王戦まで3日", True, (255, 255, 255),)
+        self.assets_ready = True
+        self.dirty.mark_all()
+        self.transition.start(self.screen, "in", self.fade_in_time)
+        start_music()
+        if not startup.reported:
+            startup.stage("title_assets")
+            startup.report()
 
     def setup_buttons(self):
         """ボタンの初期化"""
-        button_width = 240
-        self.vol_up_btn = pygame.Rect(20, 950, button_width, 60)
-        self.vol_down_btn = pygame.Rect(20, 1000, button_width, 60)
-        self.start_btn = pygame.Rect(self.width // 2 - 98, self.height // 2, 196, 60)
-        self.exit_btn = pygame.Rect(self.width // 2 - 90, self.height // 2 + 100, 180, 60)
+        vp = self.viewport
+        button_width = vp.length(240)
+        self.vol_up_btn = pygame.Rect(vp.length(20), self.height - vp.length(130), button_width, vp.length(60))
+        self.vol_down_btn = pygame.Rect(vp.length(20), self.height - vp.length(80), button_width, vp.length(60))
+        self.start_btn = pygame.Rect(self.width // 2 - vp.length(98), self.height // 2, vp.length(196), vp.length(60))
+        self.exit_btn = pygame.Rect(self.width // 2 - vp.length(90), self.height // 2 + vp.length(100), vp.length(180), vp.length(60))
 
     def draw_scene(self):
         """シーンの描画処理"""
@@ -67,36 +89,46 @@ class HomeScene(SceneBase):
         
         # 背景と要素の描画
         self.screen.blit(self.bg, (0, 0))
-        #self.screen.blit(self.home_girl, (1200, 210))
-        self.screen.blit(self.title_text, (self.width // 2 - self.title_text.get_width() // 2, 200))
+        vp = self.viewport
+        self.screen.blit(self.title_text, (self.width // 2 - self.title_text.get_width() // 2, vp.length(200)))
         
 
-        # ボタン描画（色を少し暗めに調整）
-        self.vol_up_btn = draw_button(self.screen, "Volume Up", (20, 910), 50, (50, 90, 130), (255, 255, 255))
-        self.vol_down_btn = draw_button(self.screen, "Volume Down", (20, 990), 50, (50, 90, 130), (255, 255, 255))
-        self.start_btn = draw_button(self.screen, "GameStart", (self.width // 2 - 98, self.height // 2), 50, (24, 100, 24), (255, 255, 255))
-        self.exit_btn = draw_button(self.screen, "GameExit", (self.width // 2 - 90, self.height // 2 + 100), 50, (120, 24, 24), (255, 255, 255))
+        # ボタン描画（色を少し暗めに調整）。位置は1920x1080基準で、下端からの距離は画面の高さから引く
+        font_size = vp.length(50)
+        self.vol_up_btn = draw_button(self.screen, "Volume Up", (vp.length(20), self.height - vp.length(170)), font_size, (50, 90, 130), (255, 255, 255), scale=vp.scale)
+        self.vol_down_btn = draw_button(self.screen, "Volume Down", (vp.length(20), self.height - vp.length(90)), font_size, (50, 90, 130), (255, 255, 255), scale=vp.scale)
+        self.start_btn = draw_button(self.screen, "GameStart", (self.width // 2 - vp.length(98), self.height // 2), font_size, (24, 100, 24), (255, 255, 255), scale=vp.scale)
+        self.exit_btn = draw_button(self.screen, "GameExit", (self.width // 2 - vp.length(90), self.height // 2 + vp.length(100)), font_size, (120, 24, 24), (255, 255, 255), scale=vp.scale)
         
         # デバッグ情報表示
         if self.debug_info:
             debug_surface = self.debug_font.render(self.debug_info, True, (255, 0, 0))
-            self.screen.blit(debug_surface, (10, 10))
+            self.screen.blit(debug_surface, vp.point(10, 10))
 
     def process_input(self, events, keys):
         """入力処理"""
-        # フェード中は入力を無視
-        if not self.fade_completed:
+        # 素材の読み込み中は入力を無視し、フェード中のクリックはフェードが終わってから処理する
+        if not self.assets_ready:
             return
-            
+        events = self.transition.filter(events)
         for event in events:
             if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
                 pygame.quit()
                 exit()
 
+            if event.type == pygame.MOUSEMOTION:
+                # ホバー表示が変わったボタンだけ描き直す
+                shadow = shadow_offset(self.viewport.scale)
+                self.dirty.track_hover("vol_up", self.vol_up_btn, event.pos, shadow)
+                self.dirty.track_hover("vol_down", self.vol_down_btn, event.pos, shadow)
+                self.dirty.track_hover("start", self.start_btn, event.pos, shadow)
+                self.dirty.track_hover("exit", self.exit_btn, event.pos, shadow)
+
             if event.type == pygame.MOUSEBUTTONDOWN:
                 # マウス位置を取得
-                mouse_pos = pygame.mouse.get_pos()
+                mouse_pos = event.pos  # 拡大表示時も描画先の座標
                 self.debug_info = f"Click: {mouse_pos}"
+                self.dirty.mark(pygame.Rect(0, 0, self.width, self.viewport.length(50)))  # デバッグ表示の行
                 
                 if is_button_clicked(self.vol_up_btn, event):
                     self.volume_manager.increase_volume()
@@ -113,38 +145,57 @@ class HomeScene(SceneBase):
                     # 明示的にゲームシーンをインポート
                     try:
                         from scenes.game import GameScene
-                        # シーン切り替え前にデバッグ表示を一度更新
-                        self.render(self.screen)
-                        pygame.display.flip()
-                        pygame.time.delay(500)  # デバッグ情報を確認するための遅延
-                        self.switch_to_scene(GameScene())
+                        # クラスを渡すと前に作ったゲームシーンが使い回される
+                        self.switch_to_scene(GameScene)
                     except Exception as e:
                         self.debug_info = f"Error: {str(e)}"
 
+    def is_ready(self):
+        return self.assets_ready
+
+    def on_resume(self):
+        """ゲームから戻ってきた時は素材を読み直さず、フェードとBGMだけやり直す"""
+        self.debug_info = ""
+        self.dirty.mark_all()
+        if self.assets_ready:
+            self.transition.start(self.screen, "in", self.fade_in_time)
+            start_music()
+
+    def dispose(self):
+        self.preloader.shutdown()
+        resources.release(("font", None, self.viewport.length(30)))
+        if self.assets_ready:
+            resources.release(("image", BG_PATH, (self.width, self.height)))
+            resources.release(("font", "assets/LightNovel.otf", self.viewport.length(150)))
+
     def render(self, screen):
         """描画処理"""
+        # 差分描画モードで変化が無ければ何も描かない
+        if not self.dirty.is_dirty():
+            return
+        # 素材の読み込み中は真っ黒なプレースホルダー（この後のフェードインも黒から始まる）
+        if not self.assets_ready:
+            screen.fill((0, 0, 0))
+            return
+        screen.set_clip(self.dirty.clip_rect())
+
         # 通常の描画
         self.draw_scene()
         
-        # フェードエフェクト処理（まだフェードが完了していない場合）
-        if not self.fade_completed:
-            # フェード用の黒いオーバーレイ
-            fade_surface = pygame.Surface((self.width, self.height))
-            fade_surface.fill((0, 0, 0))
-            fade_surface.set_alpha(self.fade_alpha)
-            screen.blit(fade_surface, (0, 0))
-            
-            # フェードアルファ値を更新
-            self.fade_alpha -= self.fade_speed
-            if self.fade_alpha <= 0:
-                self.fade_alpha = 0
-                self.fade_completed = True
-                # フェード完了時にイベントキューをクリア
-                pygame.event.clear()
-        
-        # 画面を更新
-        pygame.display.flip()
+        # フェードイン中なら黒を重ねる（作り置きの黒いSurfaceをalphaで重ねるのでフレームごとにSurfaceを作らない）
+        self.transition.draw(screen)
 
-    def update(self):
+        # 画面への反映はrun_gameがself.dirty.present()で行う
+        screen.set_clip(None)
+
+    def update(self, dt):
         """更新処理"""
-        self.clock.tick(60)  # フレームレート制御
\ No newline at end of file
+        if not self.assets_ready:
+            self.preloader.pump()
+            if not self.preloader.is_pending(BG_PATH):
+                self.load_assets()
+            # フェードは素材が揃ってから始める
+            return
+        # フェードは経過時間で進める（フェード中は毎フレーム全体が変わる）
+        if self.transition.update(dt):
+            self.dirty.mark_all()
\ No newline at end of file
@@ -0,0 +1,178 @@
+import io
+import json
+import mmap
+import os
+import struct
+import threading
+
+import pygame
+
+# アーカイブの先頭: マジック(8バイト) + インデックスJSONの長さ(uint32, little endian) + インデックスJSON
+ARCHIVE_MAGIC = b"NVPAK1\0\0"
+ARCHIVE_HEADER = struct.Struct("<8sI")
+ASSET_DIR = "assets"
+DEFAULT_ARCHIVE = "assets.pak"
+
+
+def asset_name(path):
+    """
+    アーカイブ内の名前に変換する（"assets/" を除いた相対パス、区切りは "/"、小文字）。
+    Windowsと同じく大文字小文字を区別しないで探せるようにする。
+    """
+    name = os.path.normpath(path).replace(os.sep, "/")
+    prefix = ASSET_DIR + "/"
+    if name.startswith(prefix):
+        name = name[len(prefix):]
+    return name.lower()
+
+
+class _BufferReader(io.RawIOBase):
+    """memoryviewをファイルのように読む（全体をコピーせずに必要な分だけ渡す）"""
+
+    def __init__(self, view):
+        self._view = view
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = min(len(buffer), len(self._view) - self._pos)
+        buffer[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        else:
+            self._pos = len(self._view) + offset
+        self._pos = max(0, min(self._pos, len(self._view)))
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+
+class AssetArchive:
+    """
+    tools/pack_assets.py で作った1ファイルのアーカイブをmmapで開いて読む。
+    インデックスは 名前 -> {offset, length, width, height, format}。
+    formatが "rgba" の画像はデコードせずにmmap上のピクセルをそのままSurfaceにする。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        # ACCESS_COPY: 書き込みはこのプロセスだけの複製になるので、Surfaceが誤って書いても元ファイルは壊れない
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_COPY)
+        self._view = memoryview(self._mmap)
+        magic, index_len = ARCHIVE_HEADER.unpack_from(self._mmap, 0)
+        if magic != ARCHIVE_MAGIC:
+            raise ValueError(f"{path} is not an asset archive")
+        start = ARCHIVE_HEADER.size
+        self.entries = json.loads(bytes(self._view[start:start + index_len]).decode("utf-8"))["entries"]
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def view(self, name):
+        """名前に対応するデータのmemoryview（コピーしない）"""
+        entry = self.entries[name]
+        return self._view[entry["offset"]:entry["offset"] + entry["length"]]
+
+    def open(self, name):
+        """ファイルのように読めるオブジェクトを返す（フォントや音声用）"""
+        return _BufferReader(self.view(name))
+
+    def load_image(self, name):
+        entry = self.entries[name]
+        if entry["format"] == "rgba":
+            return pygame.image.frombuffer(self.view(name), (entry["width"], entry["height"]), "RGBA")
+        return pygame.image.load(self.open(name), name)
+
+
+_archive = None
+_archive_checked = False
+_archive_lock = threading.Lock()
+_dir_cache = {}  # ディレクトリ -> {小文字の名前: 実際の名前}
+
+
+def get_archive():
+    """
+    アーカイブがあれば開いて返す（無ければNone）。
+    場所は環境変数 NOVEL_ASSET_ARCHIVE で変えられる。先読みスレッドからも呼ばれる。
+    """
+    global _archive, _archive_checked
+    if _archive_checked:
+        return _archive
+    with _archive_lock:
+        if not _archive_checked:
+            path = os.environ.get("NOVEL_ASSET_ARCHIVE", DEFAULT_ARCHIVE)
+            if os.path.exists(path):
+                try:
+                    _archive = AssetArchive(path)
+                except (OSError, ValueError) as e:
+                    print(f"Could not open asset archive {path}: {e}")
+            _archive_checked = True
+    return _archive
+
+
+def resolve_path(path):
+    """
+    ディスク上の実際のパスを返す（大文字小文字が違っていても見つける）。無ければNone。
+    ディレクトリの中身は一度だけ読んでキャッシュする。
+    """
+    if os.path.exists(path):
+        return path
+    directory, filename = os.path.split(path)
+    if directory and not os.path.isdir(directory):
+        directory = resolve_path(directory)
+        if directory is None:
+            return None
+    listing = _dir_cache.get(directory)
+    if listing is None:
+        try:
+            listing = {entry.lower(): entry for entry in os.listdir(directory or ".")}
+        except OSError:
+            listing = {}
+        _dir_cache[directory] = listing
+    actual = listing.get(filename.lower())
+    if actual is None:
+        return None
+    return os.path.join(directory, actual)
+
+
+def exists(path):
+    """素材があるかどうか（アーカイブ→ディスクの順に探す）"""
+    archive = get_archive()
+    if archive is not None and asset_name(path) in archive:
+        return True
+    return resolve_path(path) is not None
+
+
+def load_image(path):
+    """画像を読み込む（アーカイブ→ディスクの順に探す）。convert()はしない"""
+    archive = get_archive()
+    if archive is not None:
+        name = asset_name(path)
+        if name in archive:
+            return archive.load_image(name)
+    resolved = resolve_path(path)
+    return pygame.image.load(resolved if resolved is not None else path)
+
+
+def open_asset(path):
+    """フォント・音声などをファイルのように開く（アーカイブ→ディスクの順に探す）"""
+    archive = get_archive()
+    if archive is not None:
+        name = asset_name(path)
+        if name in archive:
+            return archive.open(name)
+    resolved = resolve_path(path)
+    return open(resolved if resolved is not None else path, "rb")
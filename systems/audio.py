@@ -0,0 +1,187 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+from systems import assets
+from systems.profiler import profiler
+
+BUSES = ("bgm", "se", "voice")
+CLICK_SE = "assets/Click.mp3"
+
+
+class AudioManager:
+    """
+    音まわりをまとめて扱う（プロセスに1つ、シーンをまたいで共有する）。
+    ・ミキサーは最初に音が必要になった時に init() する（バッファサイズは configure() で変えられる）
+    ・効果音はデコード済みのSoundをバンクに持ち、空いているチャンネルで鳴らす（先読みは別スレッド）
+    ・BGMは pygame.mixer.music でファイルから少しずつ読みながら再生する
+    ・BGM / SE / ボイスは別々の音量を持つ（ボイスは専用チャンネル）
+    ミキサーが使えない環境では何もしない。
+    """
+
+    def __init__(self):
+        self.frequency = 44100
+        self.buffer = 512  # 小さいほどクリック音が早く鳴る（小さすぎると音が途切れる）
+        self.num_channels = 16
+        self.enabled = None  # init()するまでNone
+        self.volumes = {bus: 1.0 for bus in BUSES}
+        self.current_bgm = None
+        self._bank = {}  # パス -> Sound
+        self._pending = {}  # パス -> Future
+        self._executor = None
+        self._voice_channel = None
+        self._bgm_file = None  # 再生中のBGMのファイル（ストリーミング中は開いたままにする）
+        self.play_ms = []  # 効果音の再生要求にかかった時間（直近の分）
+
+    def configure(self, frequency=None, buffer=None, num_channels=None):
+        """init()より前に呼ぶ"""
+        if frequency:
+            self.frequency = frequency
+        if buffer:
+            self.buffer = buffer
+        if num_channels:
+            self.num_channels = num_channels
+
+    def init(self):
+        """ミキサーを初期化する（2回目以降は何もしない）。使えればTrue"""
+        if self.enabled is not None:
+            return self.enabled
+        try:
+            pygame.mixer.init(frequency=self.frequency, buffer=self.buffer)
+            pygame.mixer.set_num_channels(self.num_channels)
+            # チャンネル0はボイス専用（効果音の空きチャンネル探しでは使わない）
+            pygame.mixer.set_reserved(1)
+            self._voice_channel = pygame.mixer.Channel(0)
+            self.enabled = True
+            print(f"Audio: {self.frequency} Hz, buffer {self.buffer} samples ({self.latency_ms():.1f} ms)")
+        except pygame.error as e:
+            print(f"Audio is not available: {e}")
+            self.enabled = False
+        return self.enabled
+
+    def latency_ms(self):
+        """ミキサーのバッファ1つ分の遅延（ミリ秒）"""
+        return self.buffer / self.frequency * 1000
+
+    # --- 音量 ---
+
+    def get_volume(self, bus):
+        return self.volumes[bus]
+
+    def set_volume(self, bus, volume):
+        volume = max(0.0, min(1.0, volume))
+        self.volumes[bus] = volume
+        if not self.enabled:
+            return
+        if bus == "bgm":
+            pygame.mixer.music.set_volume(volume)
+        elif bus == "voice":
+            self._voice_channel.set_volume(volume)
+
+    # --- 効果音 ---
+
+    def _load_sound(self, path):
+        with assets.open_asset(path) as f:
+            return pygame.mixer.Sound(file=f)
+
+    def preload(self, path):
+        """効果音のデコードを別スレッドで予約する"""
+        if not self.init() or path in self._bank or path in self._pending:
+            return
+        if not assets.exists(path):
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audio")
+        self._pending[path] = self._executor.submit(self._load_sound, path)
+
+    def sound(self, path):
+        """デコード済みの効果音（無ければここで読み込む）。読めなければNone"""
+        sound = self._bank.get(path)
+        if sound is not None:
+            return sound
+        future = self._pending.pop(path, None)
+        try:
+            sound = future.result() if future is not None else self._load_sound(path)
+        except (pygame.error, OSError) as e:
+            print(f"Could not load sound {path}: {e}")
+            sound = None
+        self._bank[path] = sound
+        profiler.count("sound_load")
+        return sound
+
+    def unload(self, path):
+        """バンクから効果音を外す（先読み中なら取り消す）"""
+        self._bank.pop(path, None)
+        future = self._pending.pop(path, None)
+        if future is not None:
+            future.cancel()
+
+    def play_se(self, path):
+        if not self.init():
+            return
+        start = time.perf_counter()
+        sound = self.sound(path)
+        if sound is None:
+            return
+        # 空いているチャンネルを使う（全部使用中なら一番古い音を止めて使う）
+        channel = pygame.mixer.find_channel(True)
+        channel.set_volume(self.volumes["se"])
+        channel.play(sound)
+        self.play_ms.append((time.perf_counter() - start) * 1000)
+        del self.play_ms[:-100]
+
+    def play_voice(self, path):
+        """ボイスを専用チャンネルで鳴らす（前のボイスは止まる）。ボイスは使い回さないのでバンクに入れない"""
+        if not self.init():
+            return
+        try:
+            sound = self._load_sound(path)
+        except (pygame.error, OSError) as e:
+            print(f"Could not load voice {path}: {e}")
+            return
+        self._voice_channel.set_volume(self.volumes["voice"])
+        self._voice_channel.play(sound)
+
+    # --- BGM ---
+
+    def play_bgm(self, path, fade_ms=0):
+        """BGMをループ再生する（同じ曲が流れていれば何もしない）。pathがNoneなら止める"""
+        if path is None:
+            self.stop_bgm(fade_ms)
+            return
+        if path == self.current_bgm or not self.init():
+            return
+        try:
+            bgm_file = assets.open_asset(path)
+            pygame.mixer.music.load(bgm_file, path)
+        except (pygame.error, OSError) as e:
+            print(f"Could not play BGM {path}: {e}")
+            return
+        if self._bgm_file is not None:
+            self._bgm_file.close()
+        self._bgm_file = bgm_file
+        self.current_bgm = path
+        pygame.mixer.music.set_volume(self.volumes["bgm"])
+        pygame.mixer.music.play(-1, fade_ms=fade_ms)
+
+    def stop_bgm(self, fade_ms=0):
+        self.current_bgm = None
+        if not self.enabled:
+            return
+        if fade_ms:
+            pygame.mixer.music.fadeout(fade_ms)
+        else:
+            pygame.mixer.music.stop()
+
+    def stats(self):
+        play_ms = sorted(self.play_ms)
+        return {
+            "buffer_latency_ms": self.latency_ms(),
+            "se_play_ms_max": play_ms[-1] if play_ms else 0.0,
+            "sounds": len(self._bank),
+        }
+
+
+# プロセス全体で1つ
+audio = AudioManager()
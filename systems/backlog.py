@@ -0,0 +1,33 @@
+class Backlog:
+    """
+    表示したテキストの履歴（バックログ）。
+    (名前番号, 本文) のタプルを固定長のリングバッファに入れ、いっぱいになったら古いものから上書きする。
+    本文はシナリオの命令が持っている文字列をそのまま参照するのでコピーは増えない。
+    """
+
+    def __init__(self, capacity=20000):
+        self.capacity = capacity
+        self._items = [None] * capacity
+        self._start = 0  # 一番古い行の位置
+        self._count = 0
+
+    def append(self, name_id, text):
+        self._items[(self._start + self._count) % self.capacity] = (name_id, text)
+        if self._count < self.capacity:
+            self._count += 1
+        else:
+            self._start = (self._start + 1) % self.capacity
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        """index番目（0が一番古い）の (名前番号, 本文)"""
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return self._items[(self._start + index) % self.capacity]
+
+    def clear(self):
+        # 中身は次のappendで上書きされるので、位置だけ戻す
+        self._start = 0
+        self._count = 0
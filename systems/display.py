@@ -0,0 +1,124 @@
+import pygame
+
+# 画面レイアウトの基準になる論理解像度（座標はすべてこのサイズで書き、Viewportで実際のピクセルに直す）
+LOGICAL_SIZE = (1920, 1080)
+SCALE_FILTERS = ("smooth", "integer")
+
+
+def parse_size(text):
+    """"1280x720" -> (1280, 720)"""
+    width, _, height = text.lower().partition("x")
+    return int(width), int(height)
+
+
+class Viewport:
+    """
+    論理座標（1920x1080基準）を描画先のピクセルに変換する。
+    縦横比が違う場合は小さい方の倍率に合わせる（右端・下端からの位置は呼び出し側で描画先の幅・高さから引く）。
+    """
+
+    def __init__(self, size, logical_size=LOGICAL_SIZE):
+        self.size = tuple(size)
+        self.logical_size = logical_size
+        self.scale = min(size[0] / logical_size[0], size[1] / logical_size[1])
+
+    def length(self, value):
+        """論理ピクセルの長さ・座標を描画先のピクセルにする（0より大きい長さは最低1）"""
+        scaled = int(round(value * self.scale))
+        if value > 0 and scaled < 1:
+            return 1
+        return scaled
+
+    def point(self, x, y):
+        return self.length(x), self.length(y)
+
+    def rect(self, x, y, width, height):
+        return pygame.Rect(self.length(x), self.length(y), self.length(width), self.length(height))
+
+
+class Display:
+    """
+    ウィンドウと描画先のSurfaceをまとめて持つ。
+    描画解像度がウィンドウと同じならウィンドウに直接描く。
+    違う場合は描画解像度のSurfaceに描き、フレームの最後に1回だけウィンドウへ拡大する
+    （smooth: 縦横比を保って滑らかに拡大、integer: 整数倍の最近傍拡大。余白は黒）。
+    """
+
+    def __init__(self, window, render_size=None, scale_filter="smooth"):
+        self.window = window
+        self.scale_filter = scale_filter
+        window_size = window.get_size()
+        render_size = tuple(render_size or window_size)
+        self.dest = None  # 拡大先（ウィンドウのサブサーフェス）
+        self.offset = (0, 0)
+        self.factor = 1.0
+        if render_size == window_size:
+            self.surface = window
+        else:
+            self.surface = pygame.Surface(render_size).convert(window)
+            factor = min(window_size[0] / render_size[0], window_size[1] / render_size[1])
+            if scale_filter == "integer":
+                factor = max(1, int(factor))
+            dest_size = (min(window_size[0], int(render_size[0] * factor)), min(window_size[1], int(render_size[1] * factor)))
+            self.offset = ((window_size[0] - dest_size[0]) // 2, (window_size[1] - dest_size[1]) // 2)
+            self.factor = factor
+            self.dest = window.subsurface(pygame.Rect(self.offset, dest_size))
+            window.fill((0, 0, 0))
+        self.viewport = Viewport(render_size)
+
+    def to_render(self, pos):
+        """ウィンドウ上の座標を描画先の座標にする（マウス入力用）"""
+        if self.dest is None:
+            return pos
+        x = int((pos[0] - self.offset[0]) / self.factor)
+        y = int((pos[1] - self.offset[1]) / self.factor)
+        width, height = self.surface.get_size()
+        return min(max(x, 0), width - 1), min(max(y, 0), height - 1)
+
+    def present(self, dirty):
+        """描いたフレームをウィンドウに反映する（拡大する場合は変化があったフレームだけ全体を拡大して送る）"""
+        if self.dest is not None and dirty.is_dirty():
+            if self.scale_filter == "smooth":
+                pygame.transform.smoothscale(self.surface, self.dest.get_size(), self.dest)
+            else:
+                pygame.transform.scale(self.surface, self.dest.get_size(), self.dest)
+            dirty.mark_all()
+        dirty.present()
+
+
+_display = None
+_viewports = {}  # 描画先のサイズ -> Viewport
+
+
+def set_display(display):
+    global _display
+    _display = display
+
+
+def get_display():
+    return _display
+
+
+def get_surface():
+    """シーンが描く先のSurface（Displayが無ければpygameの画面そのもの）"""
+    if _display is not None:
+        return _display.surface
+    return pygame.display.get_surface()
+
+
+def get_viewport(surface=None):
+    """描画先のサイズに合わせたViewport"""
+    surface = surface or get_surface()
+    size = surface.get_size() if surface is not None else LOGICAL_SIZE
+    viewport = _viewports.get(size)
+    if viewport is None:
+        viewport = _viewports[size] = Viewport(size)
+    return viewport
+
+
+def mouse_pos():
+    """描画先の座標でのマウス位置"""
+    pos = pygame.mouse.get_pos()
+    if _display is not None:
+        return _display.to_render(pos)
+    return pos
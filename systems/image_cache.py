@@ -0,0 +1,153 @@
+import os
+from collections import OrderedDict
+
+import pygame
+
+from systems import assets
+from systems.profiler import profiler
+
+
+def surface_bytes(surface):
+    """サーフェスが占めるおおよそのバイト数"""
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+def pixel_format_key(surface=None):
+    """変換先のピクセルフォーマットを表すキー（画面が変わればキャッシュも別物）"""
+    if surface is None:
+        surface = pygame.display.get_surface()
+    if surface is None:
+        return None
+    return (surface.get_bitsize(), surface.get_masks())
+
+
+class SurfaceCache:
+    """バイト数上限つきのLRUサーフェスキャッシュ"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (value, nbytes)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value, nbytes):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.used_bytes -= old[1]
+        self._entries[key] = (value, nbytes)
+        self.used_bytes += nbytes
+        # 上限を超えたら古いものから捨てる（今入れたものは残す）
+        while self.used_bytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.used_bytes -= evicted
+
+    def pop(self, key):
+        """エントリを取り出して削除する。無ければNone"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        self.used_bytes -= entry[1]
+        return entry[0]
+
+    def clear(self):
+        self._entries.clear()
+        self.used_bytes = 0
+
+    def __contains__(self, key):
+        # ヒット数には数えない（先読み判定用）
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """ヒット数・ミス数・使用バイト数を返す（デバッグ表示用）"""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "bytes": self.used_bytes}
+
+
+class BackgroundCache:
+    """
+    背景画像を画面サイズへ拡大縮小・convert()済みの状態で保持するキャッシュ。
+    キーは (背景ID, 画面サイズ, ピクセルフォーマット)。
+    """
+
+    def __init__(self, bg_map, asset_dir="assets", max_bytes=64 * 1024 * 1024, loader=assets.load_image):
+        self.bg_map = bg_map
+        self.asset_dir = asset_dir
+        self.cache = SurfaceCache(max_bytes)
+        self.loader = loader  # path -> 未変換のSurface（先読みスレッドと差し替え可能）
+
+    def path_for(self, bg_id):
+        bg_file = self.bg_map.get(bg_id)
+        if not bg_file:
+            return None
+        return os.path.join(self.asset_dir, bg_file)
+
+    def is_cached(self, bg_id, size):
+        return (bg_id, tuple(size), pixel_format_key()) in self.cache
+
+    def get(self, bg_id, size):
+        """背景IDに対応する描画用サーフェスを返す。無ければNone"""
+        key = (bg_id, tuple(size), pixel_format_key())
+        surface = self.cache.get(key)
+        if surface is not None:
+            return surface
+        path = self.path_for(bg_id)
+        if not path or not assets.exists(path):
+            return None
+        image = self.loader(path)
+        profiler.count("image_load")
+        if pygame.display.get_surface() is not None:
+            image = image.convert()
+        surface = pygame.transform.scale(image, size)
+        self.cache.put(key, surface, surface_bytes(surface))
+        return surface
+
+
+class SpriteCache:
+    """
+    立ち絵を拡大縮小・convert_alpha()済みの状態で描画位置と一緒に保持するキャッシュ。
+    キーは (キャラ名, 表情番号, 位置番号, 画面サイズ)。
+    layout は (元画像サイズ, 位置番号, 画面サイズ) -> (幅, 高さ, x, y) を返す関数。
+    """
+
+    def __init__(self, layout, asset_dir="assets", max_bytes=48 * 1024 * 1024, loader=assets.load_image):
+        self.layout = layout
+        self.asset_dir = asset_dir
+        self.cache = SurfaceCache(max_bytes)
+        self.loader = loader
+
+    def path_for(self, kind, face_num):
+        return os.path.join(self.asset_dir, "Cha", kind, f"{face_num}.png")
+
+    def is_cached(self, kind, face_num, pos_num, size):
+        return (kind, face_num, pos_num, tuple(size)) in self.cache
+
+    def get(self, kind, face_num, pos_num, size):
+        """(サーフェス, 描画位置) を返す。画像が無ければNone"""
+        key = (kind, face_num, pos_num, tuple(size))
+        entry = self.cache.get(key)
+        if entry is not None:
+            return entry
+        path = self.path_for(kind, face_num)
+        if not assets.exists(path):
+            return None
+        image = self.loader(path)
+        profiler.count("image_load")
+        if pygame.display.get_surface() is not None:
+            image = image.convert_alpha()
+        new_w, new_h, x, y = self.layout(image.get_size(), pos_num, size)
+        surface = pygame.transform.scale(image, (new_w, new_h))
+        entry = (surface, (x, y))
+        self.cache.put(key, entry, surface_bytes(surface))
+        return entry
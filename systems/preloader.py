@@ -0,0 +1,83 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from systems import assets
+from systems.image_cache import SurfaceCache, surface_bytes
+from systems.profiler import profiler
+
+
+class AssetPreloader:
+    """
+    画像をバックグラウンドのスレッドプールでデコードしておく先読み係。
+    デコード（PNG展開）だけをワーカーで行い、convert()や拡大縮小はメインスレッド側のキャッシュに任せる。
+    """
+
+    def __init__(self, max_workers=2, max_bytes=96 * 1024 * 1024):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="preload")
+        self._pending = {}  # path -> Future
+        self._ready = SurfaceCache(max_bytes)  # path -> デコード済みSurface
+        self.loaded = 0  # 先読みでデコードした枚数
+        self.used = 0  # 先読み結果が実際に使われた枚数
+        self.sync_loads = 0  # 先読みが間に合わずその場で読んだ枚数
+
+    def request(self, path):
+        """pathの先読みを予約する。新しく予約したときだけTrueを返す"""
+        if path in self._pending or path in self._ready:
+            return False
+        self._pending[path] = self.executor.submit(assets.load_image, path)
+        return True
+
+    def pump(self):
+        """終わったデコード結果を受け取る（メインスレッドから毎フレーム呼ぶ）"""
+        if not self._pending:
+            return
+        for path, future in list(self._pending.items()):
+            if not future.done():
+                continue
+            del self._pending[path]
+            try:
+                surface = future.result()
+            except Exception as e:
+                print(f"Preload failed: {path}: {e}")
+                continue
+            self._ready.put(path, surface, surface_bytes(surface))
+            self.loaded += 1
+            profiler.count("image_preload")
+
+    def is_ready(self, path):
+        return path in self._ready
+
+    def is_pending(self, path):
+        return path in self._pending
+
+    def load(self, path):
+        """先読み済みならそれを返し、無ければその場で読み込む（キャッシュのloaderとして使う）"""
+        self.pump()
+        surface = self._ready.pop(path)
+        if surface is not None:
+            self.used += 1
+            return surface
+        future = self._pending.pop(path, None)
+        if future is not None:
+            # デコード途中なら最初から読み直すより待った方が早い
+            try:
+                surface = future.result()
+                self.used += 1
+                return surface
+            except Exception:
+                pass
+        self.sync_loads += 1
+        return assets.load_image(path)
+
+    def stats(self):
+        return {
+            "pending": len(self._pending),
+            "ready": len(self._ready),
+            "loaded": self.loaded,
+            "used": self.used,
+            "sync_loads": self.sync_loads,
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self._pending.clear()
+        self._ready.clear()
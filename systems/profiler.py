@@ -0,0 +1,143 @@
+import atexit
+import csv
+import json
+import math
+import os
+import time
+from collections import deque
+
+import pygame
+
+PHASES = ("input", "update", "render", "flip")
+
+
+def percentile(sorted_values, p):
+    """ソート済みリストのpパーセンタイル（最近傍順位法）"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(p * len(sorted_values) / 100) - 1))
+    return sorted_values[index]
+
+
+class FrameProfiler:
+    """
+    フレームごとの処理時間（input/update/render/flip）と各種カウンタを記録する。
+    無効時は何もしない。有効化は run_game の --profile か環境変数 NOVEL_PROFILE で行う。
+    """
+
+    def __init__(self, max_frames=100000):
+        self.enabled = False
+        self.overlay = False
+        self.dump_path = None
+        self.frames = deque(maxlen=max_frames)  # (input, update, render, flip, total) ミリ秒
+        self.counters = {}
+        self._frame_start = 0.0
+        self._last = 0.0
+        self._current = {}
+        self._overlay_font = None
+        self._overlay_surface = None
+        self._overlay_updated = 0.0
+
+    def configure(self, enabled, overlay=False, dump_path=None):
+        self.enabled = enabled
+        self.overlay = enabled and overlay
+        self.dump_path = dump_path
+        if enabled and dump_path:
+            # どの終了経路（ESC・ウィンドウの×・exit()）でも結果を書き出す
+            atexit.register(self.dump)
+
+    def count(self, name, n=1):
+        """カウンタを増やす（画像読み込み回数・フォント描画回数など）"""
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def start_frame(self):
+        if not self.enabled:
+            return
+        self._frame_start = self._last = time.perf_counter()
+        self._current = {}
+
+    def mark(self, phase):
+        """前回のmarkからの経過時間をphaseの時間として記録する"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self._current[phase] = self._current.get(phase, 0.0) + (now - self._last) * 1000
+        self._last = now
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        total = (time.perf_counter() - self._frame_start) * 1000
+        self.frames.append(tuple(self._current.get(phase, 0.0) for phase in PHASES) + (total,))
+
+    def summary(self):
+        """フレーム時間のp50/p95/p99とフェーズごとの平均（ミリ秒）"""
+        result = {"frames": len(self.frames), "counters": dict(self.counters)}
+        if not self.frames:
+            return result
+        totals = sorted(frame[-1] for frame in self.frames)
+        result["frame_ms"] = {
+            "p50": percentile(totals, 50),
+            "p95": percentile(totals, 95),
+            "p99": percentile(totals, 99),
+            "max": totals[-1],
+        }
+        result["phase_avg_ms"] = {
+            phase: sum(frame[i] for frame in self.frames) / len(self.frames)
+            for i, phase in enumerate(PHASES)
+        }
+        return result
+
+    def draw_overlay(self, screen, dirty=None):
+        """画面右上に計測結果を重ねて表示する（文字の作り直しは0.5秒に1回）"""
+        if not self.overlay:
+            return
+        now = time.perf_counter()
+        if self._overlay_surface is None or now - self._overlay_updated >= 0.5:
+            if self._overlay_font is None:
+                self._overlay_font = pygame.font.Font(None, 24)
+            summary = self.summary()
+            frame_ms = summary.get("frame_ms", {})
+            phase_ms = summary.get("phase_avg_ms", {})
+            lines = [
+                "frame p50 {:.1f} / p95 {:.1f} / p99 {:.1f} ms".format(
+                    frame_ms.get("p50", 0), frame_ms.get("p95", 0), frame_ms.get("p99", 0)),
+                " ".join("{} {:.1f}".format(phase, phase_ms.get(phase, 0)) for phase in PHASES),
+                " ".join("{}={}".format(name, value) for name, value in sorted(self.counters.items())),
+            ]
+            line_surfaces = [self._overlay_font.render(line, True, (255, 255, 0)) for line in lines]
+            width = max(surface.get_width() for surface in line_surfaces) + 12
+            height = sum(surface.get_height() for surface in line_surfaces) + 12
+            self._overlay_surface = pygame.Surface((width, height))
+            self._overlay_surface.fill((0, 0, 0))
+            y = 6
+            for surface in line_surfaces:
+                self._overlay_surface.blit(surface, (6, y))
+                y += surface.get_height()
+            self._overlay_updated = now
+        rect = screen.blit(self._overlay_surface, (screen.get_width() - self._overlay_surface.get_width() - 10, 10))
+        if dirty is not None:
+            dirty.mark(rect)
+
+    def dump(self):
+        """計測結果を書き出す（拡張子が.csvならフレームごとの生データ、それ以外はJSONの要約）"""
+        if not self.enabled or not self.dump_path:
+            return
+        try:
+            if os.path.splitext(self.dump_path)[1].lower() == ".csv":
+                with open(self.dump_path, "w", newline="", encoding="utf-8") as f:
+                    writer = csv.writer(f)
+                    writer.writerow(PHASES + ("total",))
+                    for frame in self.frames:
+                        writer.writerow(["{:.3f}".format(value) for value in frame])
+            else:
+                with open(self.dump_path, "w", encoding="utf-8") as f:
+                    json.dump(self.summary(), f, indent=2)
+            print(f"Profile written to {self.dump_path}")
+        except OSError as e:
+            print(f"Could not write profile: {e}")
+
+
+# プロセス全体で共有する計測器（キャッシュやシーンからカウンタを増やす）
+profiler = FrameProfiler()
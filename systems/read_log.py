@@ -0,0 +1,69 @@
+import json
+import os
+
+from systems.save import save_dir, write_json_atomic
+
+READ_LOG_VERSION = 1
+
+
+def read_log_path(scenario_path):
+    """シナリオファイルごとの既読ファイルの場所"""
+    name = os.path.splitext(os.path.basename(scenario_path))[0]
+    return os.path.join(save_dir(), f"{name}.read.json")
+
+
+class ReadLog:
+    """
+    既読の (チャプター, 行番号) を覚えておく。
+    チャプターごとに1行1ビットのビット列（bytearray）で持つので、既読かどうかの判定は添字計算だけで済む。
+    行番号はコンパイル済みの命令列の位置（シナリオの1行 = 1命令）。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.chapters = {}  # チャプター -> bytearray
+        self.changed = False
+        self.load()
+
+    def is_read(self, chapter, line):
+        bits = self.chapters.get(chapter)
+        if bits is None or (line >> 3) >= len(bits):
+            return False
+        return bits[line >> 3] & (1 << (line & 7)) != 0
+
+    def mark(self, chapter, line):
+        bits = self.chapters.get(chapter)
+        if bits is None:
+            bits = self.chapters[chapter] = bytearray()
+        index = line >> 3
+        if index >= len(bits):
+            bits.extend(bytes(index + 1 - len(bits)))
+        mask = 1 << (line & 7)
+        if not bits[index] & mask:
+            bits[index] |= mask
+            self.changed = True
+
+    def count(self):
+        """既読の行数"""
+        return sum(bin(byte).count("1") for bits in self.chapters.values() for byte in bits)
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Could not read {self.path}: {e}")
+            return
+        if data.get("version") != READ_LOG_VERSION:
+            return
+        self.chapters = {key: bytearray.fromhex(bits) for key, bits in data.get("chapters", {}).items()}
+
+    def save(self, write=write_json_atomic):
+        """変更があれば書き出す（writeにSaveManager.writeを渡すと別スレッドで書く）"""
+        if not self.changed:
+            return
+        data = {"version": READ_LOG_VERSION, "chapters": {key: bits.hex() for key, bits in self.chapters.items()}}
+        write(self.path, data)
+        self.changed = False
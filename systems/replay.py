@@ -0,0 +1,217 @@
+"""
+入力の記録と再生（プレイの再現・性能の比較用）。
+
+記録は「何フレーム目に何をしたか」だけを持つ:
+  ・各フレームのupdateの回数（1以外の時だけ）
+  ・テキストウィンドウのクリックは ["text"]、選択肢のクリックは ["choice", 番号]、
+    それ以外のクリックは ["click", x, y, ボタン]（1920x1080基準の座標）
+  ・キー入力は ["key", キー]、ホイールは ["wheel", y]、スキップ用のCtrlの押し下げ状態は ["hold", キー, ...]
+ゲームの処理は固定の時間刻みで進むので、同じフレームに同じ入力を与えれば同じ結果になる。
+シーンの is_ready() がFalseの間（素材の読み込み待ち）は、記録・再生ともにフレームを数えない。
+ESCや終了ボタンで終えたフレームは記録しない（再生した時にそこでプロセスが終わってしまうため）。
+"""
+import atexit
+import json
+import zlib
+
+import pygame
+
+from systems.display import get_viewport
+from systems.save import write_json_atomic
+
+REPLAY_VERSION = 1
+# 押している間だけ効くキー（process_inputにkeysとして渡す分）
+HOLD_KEYS = (pygame.K_LCTRL, pygame.K_RCTRL)
+
+
+def screen_checksum(screen):
+    """画面の中身のCRC32"""
+    return zlib.crc32(screen.get_buffer())
+
+
+def scene_state(scene):
+    """確認に使う最終状態（ゲーム画面ならチャプターと行）"""
+    return {
+        "scene": type(scene).__name__,
+        "chapter": getattr(scene, "chapter", None),
+        "line": getattr(scene, "line_index", None),
+    }
+
+
+def encode_event(scene, event):
+    """記録するイベントを小さなリストにする（記録しないイベントはNone）"""
+    if event.type == pygame.MOUSEBUTTONDOWN:
+        backlog_open = getattr(getattr(scene, "backlog_view", None), "is_open", False)
+        if event.button == 1 and not backlog_open:
+            if getattr(scene, "show_choices", False):
+                for index, rect in enumerate(scene.choice_buttons):
+                    if rect.collidepoint(event.pos):
+                        return ["choice", index]
+            window = getattr(scene, "text_window_rect", None)
+            back = getattr(scene, "back_btn", None)
+            if window is not None and window.collidepoint(event.pos) and not (back and back.collidepoint(event.pos)):
+                return ["text"]
+        scale = get_viewport().scale
+        return ["click", round(event.pos[0] / scale), round(event.pos[1] / scale), event.button]
+    if event.type == pygame.KEYDOWN:
+        return ["key", event.key]
+    if event.type == pygame.MOUSEWHEEL:
+        return ["wheel", event.y]
+    return None
+
+
+def decode_event(scene, item):
+    """記録したリストを、今のシーンの上でのイベントに戻す（戻せなければNone）"""
+    kind = item[0]
+    if kind == "text":
+        return pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=scene.text_window_rect.center, button=1)
+    if kind == "choice":
+        buttons = getattr(scene, "choice_buttons", [])
+        if item[1] >= len(buttons):
+            return None
+        return pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=buttons[item[1]].center, button=1)
+    if kind == "click":
+        return pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=get_viewport().point(item[1], item[2]), button=item[3])
+    if kind == "key":
+        return pygame.event.Event(pygame.KEYDOWN, key=item[1], mod=0, unicode="", scancode=0)
+    if kind == "wheel":
+        return pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=item[1], flipped=False)
+    return None
+
+
+class HeldKeys:
+    """再生中にprocess_inputへ渡すkeysの代わり（記録した押し下げ状態だけを返す）"""
+
+    def __init__(self):
+        self.held = set()
+
+    def __getitem__(self, key):
+        return key in self.held
+
+
+class InputRecorder:
+    """run_gameの入力をフレーム番号つきで記録し、終了時（シーンがexit()した時も）にJSONへ書き出す"""
+
+    def __init__(self, path):
+        self.path = path
+        self.frame = 0
+        self.log = []  # [フレーム番号, updateの回数, [イベント, ...]]
+        self.held = ()
+        self.scene = None  # 最後に記録したフレームのシーン（最終状態として書き出す）
+        self.size = None  # 記録した時の画面の大きさ（終了時にはもう画面が無いことがあるので先に取っておく）
+        self._counted = False  # 最後のrecord()でフレームを数えたか
+        atexit.register(self.finish)
+
+    def record(self, scene, steps, events, keys):
+        self.scene = scene
+        self._counted = scene.is_ready()
+        if not self._counted:
+            return
+        if self.size is None:
+            self.size = list(get_viewport().size)
+        items = [item for item in (encode_event(scene, event) for event in events) if item is not None]
+        held = tuple(key for key in HOLD_KEYS if keys[key])
+        if held != self.held:
+            self.held = held
+            items.append(["hold", *held])
+        if items or steps != 1:
+            self.log.append([self.frame, steps, items])
+        self.frame += 1
+
+    def drop_frame(self):
+        """最後に記録したフレームを取り消す（そのフレームの入力でゲームが終了した時）"""
+        if not self._counted:
+            return
+        self._counted = False
+        self.frame -= 1
+        if self.log and self.log[-1][0] == self.frame:
+            self.log.pop()
+
+    def finish(self):
+        if self.scene is None:
+            return
+        scene, self.scene = self.scene, None
+        write_json_atomic(self.path, {
+            "version": REPLAY_VERSION,
+            "frames": self.frame,
+            "size": self.size,
+            "log": self.log,
+            "final": scene_state(scene),
+        })
+        print(f"Recorded {self.frame} frames to {self.path}")
+
+
+class InputReplayer:
+    """
+    記録した入力をフレームごとに返す。終わったら最終状態（とあれば画面のチェックサム）を確かめる。
+    checksums=True なら毎フレームの画面のチェックサムを比べる（記録に無ければ書き足して基準にする）。
+    """
+
+    def __init__(self, path, checksums=False):
+        self.path = path
+        with open(path, encoding="utf-8") as f:
+            self.data = json.load(f)
+        if self.data.get("version") != REPLAY_VERSION:
+            raise ValueError(f"unsupported replay version: {self.data.get('version')}")
+        self.frames = self.data["frames"]
+        self.log = self.data["log"]
+        self.index = 0
+        self.frame = 0
+        self.keys = HeldKeys()
+        self.checksums = checksums
+        self.expected = self.data.get("checksums") if checksums else None
+        self.actual = []
+        self.mismatches = []  # (フレーム番号, 内容)
+        self._counted = False  # このフレームを数えたか（読み込み待ちのフレームは比べない）
+
+    @property
+    def done(self):
+        return self.frame >= self.frames
+
+    def next_frame(self, scene):
+        """このフレームの (updateの回数, イベント) を返す"""
+        self._counted = scene.is_ready()
+        if not self._counted:
+            return 1, []
+        steps = 1
+        events = []
+        if self.index < len(self.log) and self.log[self.index][0] == self.frame:
+            _, steps, items = self.log[self.index]
+            self.index += 1
+            for item in items:
+                if item[0] == "hold":
+                    self.keys.held = set(item[1:])
+                    continue
+                event = decode_event(scene, item)
+                if event is None:
+                    self.mismatches.append((self.frame, f"could not replay {item}"))
+                else:
+                    events.append(event)
+        self.frame += 1
+        return steps, events
+
+    def check_frame(self, screen):
+        """描き終えたフレームの画面をチェックサムで比べる"""
+        if not self.checksums or not self._counted:
+            return
+        value = screen_checksum(screen)
+        frame = len(self.actual)
+        self.actual.append(value)
+        if self.expected is not None and frame < len(self.expected) and self.expected[frame] != value:
+            self.mismatches.append((frame, "screen checksum differs"))
+
+    def finish(self, scene):
+        """最終状態を確かめて結果を表示する。一致すればTrue"""
+        final = scene_state(scene)
+        expected = self.data.get("final")
+        if final != expected:
+            self.mismatches.append((self.frame, f"final state {final} != recorded {expected}"))
+        if self.checksums and self.expected is None:
+            self.data["checksums"] = self.actual
+            write_json_atomic(self.path, self.data)
+            print(f"Stored {len(self.actual)} screen checksums in {self.path}")
+        for frame, message in self.mismatches[:20]:
+            print(f"replay mismatch at frame {frame}: {message}")
+        ok = not self.mismatches
+        print(f"Replay {'OK' if ok else 'FAILED'}: {self.frame}/{self.frames} frames, final {final}")
+        return ok
@@ -0,0 +1,64 @@
+import pygame
+
+from systems import assets
+from systems.audio import audio
+
+
+def load_font(path, size, bold=False):
+    """フォントを読む。アーカイブにあればそこから（ファイルはFontが持ち続けるので閉じない）"""
+    font = pygame.font.Font(assets.open_asset(path) if path is not None else None, size)
+    font.set_bold(bold)
+    return font
+
+
+class ResourceRegistry:
+    """
+    フォント・画像・効果音をプロセス全体で共有する（参照カウント付き）。
+    同じキーの acquire() は2回目以降は作らずに同じものを返し、release() で使う人がいなくなったら手放す。
+    シーンを作り直しても、使い回しても、同じ素材は一度しか読み込まない。
+    """
+
+    def __init__(self):
+        self._entries = {}  # キー -> [素材, 参照数, 手放す時に呼ぶ関数]
+
+    def acquire(self, key, factory, dispose=None):
+        """keyの素材を返す（無ければfactory()で作る）。使い終わったらrelease(key)する"""
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = [factory(), 0, dispose]
+        entry[1] += 1
+        return entry[0]
+
+    def release(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] <= 0:
+            del self._entries[key]
+            if entry[2] is not None:
+                entry[2](entry[0])
+
+    def font(self, path, size, bold=False):
+        """フォント（pathがNoneならデフォルトフォント）。キーは ("font", path, size)、太字は ("font", path, size, "bold")"""
+        key = ("font", path, size, "bold") if bold else ("font", path, size)
+        return self.acquire(key, lambda: load_font(path, size, bold))
+
+    def sound(self, path):
+        """効果音をバンクに先読みしてパスを返す。キーは ("sound", path)"""
+        audio.preload(path)
+        return self.acquire(("sound", path), lambda: path, audio.unload)
+
+    def refs(self, key):
+        entry = self._entries.get(key)
+        return entry[1] if entry else 0
+
+    def stats(self):
+        counts = {}
+        for key in self._entries:
+            counts[key[0]] = counts.get(key[0], 0) + 1
+        return counts
+
+
+# プロセス全体で1つ
+resources = ResourceRegistry()
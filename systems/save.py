@@ -0,0 +1,85 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+SAVE_VERSION = 1
+AUTO_SLOT = "auto"
+QUICK_SLOT = "quick"
+
+
+def save_dir():
+    """セーブデータ類を置くディレクトリ（環境変数 NOVEL_SAVE_DIR で変えられる）"""
+    return os.environ.get("NOVEL_SAVE_DIR", "saves")
+
+
+def write_json_atomic(path, data):
+    """JSONを一時ファイルに書いてから置き換える（途中で落ちても書きかけのファイルが残らない）"""
+    tmp_path = path + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return True
+    except OSError as e:
+        print(f"Could not save {path}: {e}")
+        return False
+
+
+class SaveManager:
+    """
+    シナリオファイルごとのセーブスロットを読み書きする。
+    書き込みは1本の別スレッドで順番に行うので、セーブでフレームが止まらない。
+    スナップショットは {chapter, line, shown, bg, charas, bgm} のような小さなdict（GameScene.snapshot参照）。
+    charas は立ち絵の枠ごとの [枠名, kind, face, pos, z] のリスト。
+    """
+
+    def __init__(self, scenario_path, directory=None):
+        self.name = os.path.splitext(os.path.basename(scenario_path))[0]
+        self.directory = directory or save_dir()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="save")
+        self._last = None  # 最後に予約した書き込み
+
+    def slot_path(self, slot):
+        return os.path.join(self.directory, f"{self.name}.slot-{slot}.json")
+
+    def write(self, path, data):
+        """dataをpathへ別スレッドで書き込む（dataは予約後に変更しないこと）"""
+        self._last = self._executor.submit(write_json_atomic, path, data)
+        return self._last
+
+    def save(self, slot, snapshot):
+        data = dict(snapshot, version=SAVE_VERSION, saved_at=time.time())
+        return self.write(self.slot_path(slot), data)
+
+    def flush(self):
+        """予約済みの書き込みが終わるまで待つ"""
+        if self._last is not None:
+            self._last.result()
+            self._last = None
+
+    def load(self, slot):
+        """スロットのスナップショットを返す（無い・壊れている・バージョン違いならNone）"""
+        self.flush()
+        path = self.slot_path(slot)
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Could not read {path}: {e}")
+            return None
+        if data.get("version") != SAVE_VERSION:
+            print(f"Ignoring {path}: unsupported save version {data.get('version')}")
+            return None
+        return data
+
+    def exists(self, slot):
+        self.flush()
+        return os.path.exists(self.slot_path(slot))
+
+    def shutdown(self):
+        """書き込み中のセーブは最後まで書いてから止める"""
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,393 @@
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import re
+import sqlite3
+from collections import OrderedDict
+
+# コンパイル結果の形式を変えたら上げる（古いキャッシュは自動的に作り直される）
+COMPILER_VERSION = 3
+DEFAULT_SLOT = "main"  # 枠名を省略したcha=が使う立ち絵の枠
+
+
+class SetBg:
+    """bg=番号"""
+    __slots__ = ("bg_id",)
+
+    def __init__(self, bg_id):
+        self.bg_id = bg_id
+
+
+class SetChara:
+    """
+    cha@枠名=キャラ名,表情番号,位置番号,重なり順（kindがNoneならその枠の立ち絵を消す）。
+    枠名を省略したcha=は既定の枠。slotがNone（cha=none）なら全部の立ち絵を消す。
+    重なり順（z）が大きい立ち絵ほど手前に描く。
+    """
+    __slots__ = ("kind", "face_num", "pos_num", "slot", "z")
+
+    def __init__(self, kind, face_num="1", pos_num="1", slot=DEFAULT_SLOT, z=0):
+        self.kind = kind
+        self.face_num = face_num
+        self.pos_num = pos_num
+        self.slot = slot
+        self.z = z
+
+
+class PlayBgm:
+    """bgm=ファイル名（assets/からのパス）。bgm=none ならpathはNoneで、BGMを止める"""
+    __slots__ = ("path",)
+
+    def __init__(self, path):
+        self.path = path
+
+
+class PlaySe:
+    """se=ファイル名（assets/からのパス）"""
+    __slots__ = ("path",)
+
+    def __init__(self, path):
+        self.path = path
+
+
+class Say:
+    """
+    テキスト行。entries は $ で分割した (名前番号, 本文) のタプル。
+    2行目以降の名前番号は "" になる。entries が空なら空行（テキストウィンドウを空にする）。
+    """
+    __slots__ = ("entries",)
+
+    def __init__(self, entries):
+        self.entries = entries
+
+
+class Choices:
+    """選択肢。choices は (ラベル, ジャンプ先チャプターキー) のタプル"""
+    __slots__ = ("choices",)
+
+    def __init__(self, choices):
+        self.choices = choices
+
+
+class End:
+    """end（タイトル画面に戻る）"""
+    __slots__ = ()
+
+
+def compile_line(line, warnings=None):
+    """シナリオ1行を命令1つに変換する（行番号がずれないよう必ず1行1命令）"""
+    # choicesコマンド（分岐情報）
+    if isinstance(line, dict):
+        if "choices" in line:
+            choices = []
+            for idx, choice in enumerate(line["choices"]):
+                choices.append((choice.get("label", f"選択肢{idx+1}"), choice.get("jump")))
+            return Choices(tuple(choices))
+        if warnings is not None:
+            warnings.append(f"unknown command: {line!r}")
+        return Say(())
+    # 背景切り替え命令（番号対応）
+    if line.startswith("bg="):
+        return SetBg(line[3:].strip())
+    # 立ち絵切り替え命令（例: cha=girl,1,2 / cha@left=girl,1,3,1 / cha@left=none / cha=none）
+    if line.startswith("cha=") or line.startswith("cha@"):
+        head, _, body = line.partition("=")
+        slot = head[4:].strip() if head.startswith("cha@") else DEFAULT_SLOT
+        params = [x.strip() for x in body.split(",")]
+        if slot and params[0].lower() == "none":
+            # 枠名の無いcha=noneは全部の立ち絵を消す
+            return SetChara(None, slot=slot if head.startswith("cha@") else None)
+        if slot and 1 <= len(params) <= 4:
+            try:
+                z = int(params[3]) if len(params) == 4 else 0
+            except ValueError:
+                z = None
+            if z is not None:
+                return SetChara(*params[:3], slot=slot, z=z)
+        if warnings is not None:
+            warnings.append(f"bad cha command: {line!r}")
+        return Say(())
+    # BGM・効果音（例: bgm=MusicBox_08.mp3 / bgm=none / se=Click.mp3）
+    if line.startswith("bgm="):
+        name = line[4:].strip()
+        if name.lower() == "none":
+            return PlayBgm(None)
+        return PlayBgm(os.path.join("assets", name))
+    if line.startswith("se="):
+        return PlaySe(os.path.join("assets", line[3:].strip()))
+    if not line:
+        return Say(())
+    # 終了フラグ
+    if line == "end":
+        return End()
+    # 例: "2よし、公園で食べちゃお。$覚めるともったいないし。"
+    name_num = line[0]
+    entries = []
+    for idx, text in enumerate(line[1:].split("$")):
+        text = text.strip()
+        if text:
+            entries.append((name_num if idx == 0 else "", text))
+    return Say(tuple(entries))
+
+
+def compile_chapter(key, lines, known_keys, warnings):
+    """1チャプター分の行を命令のリストにする。存在しないジャンプ先は警告に入れる"""
+    ops = []
+    for line_no, line in enumerate(lines):
+        line_warnings = []
+        op = compile_line(line, line_warnings)
+        ops.append(op)
+        for warning in line_warnings:
+            warnings.append(f"{key}:{line_no}: {warning}")
+        if isinstance(op, Choices):
+            for label, jump in op.choices:
+                if jump not in known_keys:
+                    warnings.append(f"{key}:{line_no}: choice {label!r} jumps to unknown chapter {jump!r}")
+    return ops
+
+
+def compile_scenario(scenario):
+    """
+    {チャプターキー: [行, ...]} を {チャプターキー: [命令, ...]} に変換する。
+    choicesのジャンプ先が存在しない場合は警告のリストに入れて返す。
+    """
+    warnings = []
+    chapters = {}
+    for key, lines in scenario.items():
+        chapters[key] = compile_chapter(key, lines, scenario, warnings)
+    return chapters, warnings
+
+
+# 括弧以外の部分（文字列は中の括弧ごと）をまとめて読み飛ばし、Pythonのループは括弧1つにつき1回で済ませる
+_STRING = re.compile(rb'"(?:[^"\\]+|\\.)*"', re.S)
+_SKIP = re.compile(rb'(?:[^"\[\]{}]+|"(?:[^"\\]+|\\.)*")*', re.S)
+_SCALAR = re.compile(rb'[^,}\]\s]+')
+_WS = re.compile(rb"\s*")
+
+
+def _value_end(buf, pos):
+    """posから始まるJSONの値の終わりの位置"""
+    first = buf[pos:pos + 1]
+    if first == b'"':
+        return _STRING.match(buf, pos).end()
+    if first not in (b"[", b"{"):
+        return _SCALAR.match(buf, pos).end()
+    depth = 0
+    while True:
+        pos = _SKIP.match(buf, pos).end()
+        c = buf[pos:pos + 1]
+        if not c:
+            raise ValueError("unterminated JSON value")
+        depth += 1 if c in (b"[", b"{") else -1
+        pos += 1
+        if depth == 0:
+            return pos
+
+
+def index_chapters(buf):
+    """
+    シナリオJSON（トップレベルがオブジェクト）を全部は解析せずに走査し、
+    [(チャプターキー, 値の開始位置, 終了位置), ...] をファイル内の順に返す。
+    """
+    pos = 3 if buf[:3] == b"\xef\xbb\xbf" else 0  # UTF-8のBOM
+    pos = _WS.match(buf, pos).end()
+    if buf[pos:pos + 1] != b"{":
+        raise ValueError("scenario must be a JSON object")
+    pos = _WS.match(buf, pos + 1).end()
+    index = []
+    while buf[pos:pos + 1] != b"}":
+        m = _STRING.match(buf, pos)
+        if m is None:
+            raise ValueError(f"expected chapter key at byte {pos}")
+        key = json.loads(m.group().decode("utf-8"))
+        pos = _WS.match(buf, m.end()).end()
+        if buf[pos:pos + 1] != b":":
+            raise ValueError(f"expected ':' at byte {pos}")
+        start = _WS.match(buf, pos + 1).end()
+        end = _value_end(buf, start)
+        index.append((key, start, end))
+        pos = _WS.match(buf, end).end()
+        if buf[pos:pos + 1] == b",":
+            pos = _WS.match(buf, pos + 1).end()
+        elif buf[pos:pos + 1] != b"}":
+            raise ValueError(f"expected ',' or '}}' at byte {pos}")
+    return index
+
+
+def _cache_path(path):
+    directory, filename = os.path.split(path)
+    return os.path.join(directory, "__pycache__", os.path.splitext(filename)[0] + ".scenario.sqlite3")
+
+
+class ScenarioStore:
+    """
+    チャプター単位で読み込むシナリオ。辞書と同じように key in store / store[key] / store.get(key) で使える。
+    コンパイル済みのチャプターは __pycache__ のSQLiteに保存し（JSONの更新時刻・サイズ・ハッシュが変わったときだけ作り直す）、
+    使うチャプターだけをそこから読み込んで、最近使っていないものはメモリから捨てる。
+    シナリオ全体を一度にjson.loadしないので、巨大なシナリオでもメモリ使用量は一定に保たれる。
+    キャッシュを書けない環境では、JSON内のチャプターの位置を索引にしてその部分だけを解析する。
+    """
+
+    def __init__(self, path, max_chapters=32):
+        self.path = path
+        self.max_chapters = max_chapters
+        self._chapters = OrderedDict()  # 読み込み済みのチャプター（LRU）
+        self._db = None
+        self._json = None  # キャッシュが使えないときのJSON本体（mmap）
+        self._index = None  # キャッシュが使えないときの key -> (開始, 終了)
+        self.loads = 0  # チャプターを読み込んだ回数
+        self._open()
+
+    def _open(self):
+        stat = os.stat(self.path)
+        cache_path = _cache_path(self.path)
+        meta = self._read_meta(cache_path)
+        if meta and meta["mtime_ns"] == stat.st_mtime_ns and meta["size"] == stat.st_size:
+            self._connect(cache_path)
+            return
+
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            digest = hashlib.sha1(buf).hexdigest()
+            try:
+                if meta and meta["sha1"] == digest:
+                    # 中身が同じなら（touchされただけなら）作り直さない
+                    self._write_meta(cache_path, stat, digest)
+                else:
+                    self._build(cache_path, buf, stat, digest)
+                self._connect(cache_path)
+                return
+            except (OSError, sqlite3.Error) as e:
+                print(f"Could not write scenario cache: {e}")
+
+        # キャッシュが使えないときはJSONの索引を使ってチャプターごとに解析する
+        self._file = open(self.path, "rb")
+        self._json = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        index = index_chapters(self._json)
+        self._keys = [key for key, _, _ in index]
+        self._index = {key: (start, end) for key, start, end in index}
+        self._key_set = set(self._keys)
+
+    @staticmethod
+    def _read_meta(cache_path):
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            db = sqlite3.connect(cache_path)
+            try:
+                meta = dict(db.execute("SELECT key, value FROM meta"))
+            finally:
+                db.close()
+        except sqlite3.Error:
+            return None
+        if meta.get("version") != COMPILER_VERSION:
+            return None
+        return meta
+
+    @staticmethod
+    def _write_meta(cache_path, stat, digest):
+        db = sqlite3.connect(cache_path)
+        try:
+            with db:
+                db.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [
+                    ("mtime_ns", stat.st_mtime_ns), ("size", stat.st_size), ("sha1", digest),
+                ])
+        finally:
+            db.close()
+
+    def _build(self, cache_path, buf, stat, digest):
+        """JSONをチャプターごとに解析・コンパイルしてキャッシュを作る（一時ファイルに書いてから置き換える）"""
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = cache_path + ".tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        index = index_chapters(buf)
+        known_keys = {key for key, _, _ in index}
+        warnings = []
+        db = sqlite3.connect(tmp_path)
+        try:
+            with db:
+                db.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value)")
+                db.execute("CREATE TABLE chapters (ordinal INTEGER PRIMARY KEY, key TEXT UNIQUE, ops BLOB)")
+                for ordinal, (key, start, end) in enumerate(index):
+                    lines = json.loads(bytes(buf[start:end]).decode("utf-8"))
+                    ops = compile_chapter(key, lines, known_keys, warnings)
+                    db.execute("INSERT OR REPLACE INTO chapters VALUES (?, ?, ?)",
+                               (ordinal, key, pickle.dumps(ops, protocol=pickle.HIGHEST_PROTOCOL)))
+                db.executemany("INSERT INTO meta VALUES (?, ?)", [
+                    ("version", COMPILER_VERSION), ("mtime_ns", stat.st_mtime_ns),
+                    ("size", stat.st_size), ("sha1", digest),
+                ])
+        finally:
+            db.close()
+        os.replace(tmp_path, cache_path)
+        for warning in warnings:
+            print(f"Scenario warning: {self.path}: {warning}")
+
+    def _connect(self, cache_path):
+        self._db = sqlite3.connect(cache_path)
+        self._keys = [row[0] for row in self._db.execute("SELECT key FROM chapters ORDER BY ordinal")]
+        self._key_set = set(self._keys)
+
+    def _load(self, key):
+        self.loads += 1
+        if self._db is not None:
+            row = self._db.execute("SELECT ops FROM chapters WHERE key = ?", (key,)).fetchone()
+            return pickle.loads(row[0])
+        start, end = self._index[key]
+        lines = json.loads(bytes(self._json[start:end]).decode("utf-8"))
+        return compile_chapter(key, lines, self._key_set, [])
+
+    def keys(self):
+        return list(self._keys)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._key_set
+
+    def __getitem__(self, key):
+        ops = self._chapters.get(key)
+        if ops is not None:
+            self._chapters.move_to_end(key)
+            return ops
+        if key not in self._key_set:
+            raise KeyError(key)
+        ops = self._load(key)
+        self._chapters[key] = ops
+        while len(self._chapters) > self.max_chapters:
+            self._chapters.popitem(last=False)
+        return ops
+
+    def get(self, key, default=None):
+        if key not in self._key_set:
+            return default
+        return self[key]
+
+    def loaded_chapters(self):
+        """いまメモリにあるチャプターのキー"""
+        return list(self._chapters)
+
+    def close(self):
+        """キャッシュのSQLite（使えなかった時はJSONのmmap）を閉じる"""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+        if self._json is not None:
+            self._json.close()
+            self._file.close()
+            self._json = None
+
+
+def load_scenario(path):
+    """シナリオ全体をコンパイル済みの {チャプターキー: [命令, ...]} として読み込む（ツール・ベンチマーク用）"""
+    store = ScenarioStore(path)
+    try:
+        return {key: store[key] for key in store}
+    finally:
+        store.close()
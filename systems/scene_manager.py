@@ -0,0 +1,48 @@
+class SceneManager:
+    """
+    シーンのインスタンスをクラスごとに1つずつ持ち、切り替えのたびに作り直さずに使い回す。
+    切り替え元には on_suspend()、2回目以降に戻ってきたシーンには on_resume() を呼ぶ。
+    """
+
+    def __init__(self):
+        self._pool = {}  # シーンのクラス -> インスタンス
+
+    def get(self, scene_class):
+        """scene_classのインスタンス（無ければここで作る）"""
+        scene = self._pool.get(scene_class)
+        if scene is None:
+            scene = self._pool[scene_class] = scene_class()
+        return scene
+
+    def add(self, scene):
+        """外で作ったシーンを使い回しの対象にする"""
+        self._pool[type(scene)] = scene
+        return scene
+
+    def switch(self, current, target):
+        """
+        currentからtarget（シーンかシーンのクラス）へ切り替え、次に動かすシーンを返す。
+        クラスを渡した場合は使い回しのインスタンスを使う。
+        """
+        current.next_scene = current
+        current.on_suspend()
+        if isinstance(target, type):
+            resumed = target in self._pool
+            scene = self.get(target)
+        else:
+            resumed = self._pool.get(type(target)) is target
+            scene = self.add(target)
+        scene.next_scene = scene
+        if resumed:
+            scene.on_resume()
+        return scene
+
+    def dispose_all(self):
+        """使い回していたシーンを全部片付ける"""
+        for scene in self._pool.values():
+            scene.dispose()
+        self._pool.clear()
+
+
+# プロセス全体で1つ
+scene_manager = SceneManager()
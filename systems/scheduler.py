@@ -0,0 +1,34 @@
+import pygame
+
+# --fps で選べるフレームレート上限（0は上限なし。vsyncは画面の更新に合わせる）
+FPS_CAPS = {"30": 30, "60": 60, "120": 120, "uncapped": 0, "vsync": 0}
+
+
+class FrameScheduler:
+    """
+    ゲームループ全体で1つだけ使う時計。
+    描画はフレームごとに1回、updateは固定の時間刻み（step秒）で必要な回数だけ呼ぶ。
+    こうするとフレームレートが変わってもアニメーションの速さは変わらない。
+    """
+
+    def __init__(self, fps_cap=60, step=1 / 60, max_steps=5):
+        self.clock = pygame.time.Clock()
+        self.fps_cap = fps_cap
+        self.step = step
+        self.max_steps = max_steps  # 重い処理のあとに追いつこうとして固まらないための上限
+        self.accumulator = 0.0
+
+    def tick(self):
+        """フレームレート上限まで待ち、このフレームで実行する固定ステップ数を返す"""
+        self.accumulator += self.clock.tick(self.fps_cap) / 1000
+        steps = int(self.accumulator // self.step)
+        if steps > self.max_steps:
+            # 追いつけない分は捨てる（ゲーム内時間がゆっくり進むだけで、処理落ちの連鎖は起きない）
+            steps = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.step
+        return steps
+
+    def get_fps(self):
+        return self.clock.get_fps()
@@ -0,0 +1,43 @@
+import time
+
+# 起動から最初の画面が出るまでの目標時間（秒）
+FIRST_FRAME_BUDGET = 0.5
+
+
+class StartupTimer:
+    """起動処理の段階ごとの所要時間を記録して表示する"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.last = self.start
+        self.stages = []  # (段階名, その段階の秒数, 起動からの秒数)
+        self.reported = False
+
+    def stage(self, name):
+        """直前の段階からここまでをnameとして記録する"""
+        now = time.perf_counter()
+        self.stages.append((name, now - self.last, now - self.start))
+        self.last = now
+
+    def elapsed(self, name):
+        """段階nameが終わった時点の起動からの秒数（未記録ならNone）"""
+        for stage_name, _, total in self.stages:
+            if stage_name == name:
+                return total
+        return None
+
+    def report(self):
+        """記録した段階を一度だけ表示する"""
+        if self.reported:
+            return
+        self.reported = True
+        print("Startup time:")
+        for name, seconds, total in self.stages:
+            print(f"  {name:<16} {seconds * 1000:8.1f} ms  (total {total * 1000:8.1f} ms)")
+        first_frame = self.elapsed("first_frame")
+        if first_frame is not None and first_frame > FIRST_FRAME_BUDGET:
+            print(f"  first frame took longer than the {FIRST_FRAME_BUDGET * 1000:.0f} ms budget")
+
+
+# プロセス全体で1つ（main.pyのimport直後から計測する）
+startup = StartupTimer()
@@ -1,13 +1,17 @@
-import pygame
+from systems.audio import audio
 
 class VolumeManager:
-    def __init__(self):
-        self.volume = 0
+    """BGMの音量を0.1刻みで上げ下げする（音量そのものはaudioのbgmバスが持つ）"""
+
+    def __init__(self, bus="bgm"):
+        self.bus = bus
+
+    @property
+    def volume(self):
+        return audio.get_volume(self.bus)
 
     def increase_volume(self):
-        self.volume = min(1.0, self.volume + 0.1)
-        pygame.mixer.music.set_volume(self.volume)
+        audio.set_volume(self.bus, self.volume + 0.1)
 
     def decrease_volume(self):
-        self.volume = max(0.0, self.volume - 0.1)
-        pygame.mixer.music.set_volume(self.volume)
\ No newline at end of file
+        audio.set_volume(self.bus, self.volume - 0.1)
@@ -0,0 +1,103 @@
+"""
+assets/ 以下の素材を1つのアーカイブ（assets.pak）にまとめる。
+
+ゲームは起動時に assets.pak があればそれをmmapで開き、ばらばらのファイルの代わりに使う。
+--raw を付けると画像をデコード済みのRGBAで保存し、起動中のPNG展開を丸ごと省く（ファイルは大きくなる）。
+
+使い方（リポジトリのルートで）:
+    python tools/pack_assets.py
+    python tools/pack_assets.py --raw --out assets.pak
+"""
+import argparse
+import json
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pygame  # noqa: E402
+
+from systems.assets import ARCHIVE_HEADER, ARCHIVE_MAGIC, ASSET_DIR, DEFAULT_ARCHIVE, asset_name  # noqa: E402
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+ALIGN = 16
+
+
+def collect_files(asset_dir):
+    files = []
+    for directory, _, filenames in os.walk(asset_dir):
+        for filename in sorted(filenames):
+            files.append(os.path.join(directory, filename))
+    return sorted(files)
+
+
+def pack(asset_dir, out_path, raw=False):
+    """素材をまとめてアーカイブを書き出し、(ファイル数, バイト数) を返す"""
+    blobs = []
+    entries = {}
+    for path in collect_files(asset_dir):
+        name = asset_name(os.path.relpath(path, os.path.dirname(asset_dir) or "."))
+        if name in entries:
+            raise ValueError(f"duplicate asset name (case-insensitive): {path}")
+        with open(path, "rb") as f:
+            data = f.read()
+        entry = {"length": len(data), "format": os.path.splitext(path)[1].lower().lstrip(".")}
+        if path.lower().endswith(IMAGE_EXTENSIONS):
+            image = pygame.image.load(path)
+            entry["width"], entry["height"] = image.get_size()
+            if raw:
+                data = pygame.image.tobytes(image, "RGBA")
+                entry["length"] = len(data)
+                entry["format"] = "rgba"
+        entries[name] = entry
+        blobs.append((name, data))
+
+    # インデックスのサイズが決まらないとオフセットが決まらないので、オフセット抜きで一度長さを測る
+    def encode_index():
+        return json.dumps({"version": 1, "entries": entries}, ensure_ascii=False, sort_keys=True).encode("utf-8")
+
+    for name, _ in blobs:
+        entries[name]["offset"] = 0
+    while True:
+        index = encode_index()
+        offset = ARCHIVE_HEADER.size + len(index)
+        changed = False
+        for name, data in blobs:
+            offset += -offset % ALIGN
+            if entries[name]["offset"] != offset:
+                entries[name]["offset"] = offset
+                changed = True
+            offset += len(data)
+        if not changed:
+            break
+
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(ARCHIVE_HEADER.pack(ARCHIVE_MAGIC, len(index)))
+        f.write(index)
+        for name, data in blobs:
+            f.write(b"\0" * (entries[name]["offset"] - f.tell()))
+            f.write(data)
+        size = f.tell()
+    os.replace(tmp_path, out_path)
+    return len(blobs), size
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="素材をassets.pakにまとめる")
+    parser.add_argument("asset_dir", nargs="?")
+    parser.add_argument("--out")
+    parser.add_argument("--raw", action="store_true", help="画像をデコード済みRGBAで保存する")
+    args = parser.parse_args(argv)
+    # 渡されたパスは呼び出し元のディレクトリ基準（省略時の既定値はリポジトリ基準）
+    args.asset_dir = os.path.abspath(args.asset_dir) if args.asset_dir else os.path.join(ROOT, ASSET_DIR)
+    args.out = os.path.abspath(args.out) if args.out else os.path.join(ROOT, DEFAULT_ARCHIVE)
+    count, size = pack(args.asset_dir, args.out, raw=args.raw)
+    print(f"Packed {count} files into {args.out} ({size / 1024 / 1024:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
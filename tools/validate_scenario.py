@@ -0,0 +1,161 @@
+"""
+シナリオを実行せずにチェックし、チャプターごとの素材マニフェストを書き出す。
+
+ゲームと同じ規則（systems/scenario.py の compile_line）で各行を読み、次のものを報告する:
+  ・存在しないチャプターへの jump（エラー）
+  ・bg_map に無い bg= の番号、見つからない画像・音声（エラー）
+  ・読めない行（エラー）
+  ・最初のチャプターから choices をたどっても到達できないチャプター（警告）
+  ・choices も end も無く終わるチャプター（警告。ゲームはそこで先へ進めなくなる）
+全体を1回なめるだけなので、数万行のシナリオでも行数に比例した時間で終わる。
+
+使い方（リポジトリのルートで）:
+    python tools/validate_scenario.py
+    python tools/validate_scenario.py scenarios/episode1.json --manifest manifest.json
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+from collections import deque
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from scenes.game import BG_MAP  # noqa: E402
+from systems import assets  # noqa: E402
+from systems.image_cache import BackgroundCache, SpriteCache  # noqa: E402
+from systems.scenario import Choices, End, PlayBgm, PlaySe, SetBg, SetChara, compile_line  # noqa: E402
+
+ASSET_KINDS = ("bg", "cha", "bgm", "se")
+
+
+def asset_key(path):
+    """マニフェストに書くパス（区切りは常に "/"）"""
+    return path.replace(os.sep, "/")
+
+
+def analyze(scenario, bg_map=BG_MAP, asset_dir=assets.ASSET_DIR):
+    """
+    {チャプターキー: [行, ...]} をチェックして (errors, warnings, manifest) を返す。
+    manifest は {"start": 最初のチャプター, "chapters": {キー: {"bg": [...], "cha": [...], "bgm": [...], "se": [...], "jumps": [...]}}, "assets": [...]}。
+    """
+    bg_paths = BackgroundCache(bg_map, asset_dir)
+    sprite_paths = SpriteCache(None, asset_dir)
+    errors = []
+    warnings = []
+    exists = {}  # パス -> 見つかったか（同じ素材は一度だけ調べる）
+    chapters = {}
+
+    def use_asset(entry, seen, kind, path, where):
+        if path not in exists:
+            exists[path] = assets.exists(path)
+            if not exists[path]:
+                errors.append(f"{where}: missing {kind} asset {asset_key(path)}")
+        if path not in seen:
+            seen.add(path)
+            entry[kind].append(asset_key(path))
+
+    for key, lines in scenario.items():
+        entry = {kind: [] for kind in ASSET_KINDS}
+        entry["jumps"] = []
+        seen = set()
+        op = None
+        for line_no, line in enumerate(lines):
+            where = f"{key}:{line_no}"
+            line_warnings = []
+            op = compile_line(line, line_warnings)
+            for warning in line_warnings:
+                errors.append(f"{where}: {warning}")
+            if isinstance(op, SetBg):
+                path = bg_paths.path_for(op.bg_id)
+                if path is None:
+                    errors.append(f"{where}: bg id {op.bg_id!r} is not in bg_map")
+                else:
+                    use_asset(entry, seen, "bg", path, where)
+            elif isinstance(op, SetChara) and op.kind is not None:
+                use_asset(entry, seen, "cha", sprite_paths.path_for(op.kind, op.face_num), where)
+            elif isinstance(op, PlayBgm) and op.path is not None:
+                use_asset(entry, seen, "bgm", op.path, where)
+            elif isinstance(op, PlaySe):
+                use_asset(entry, seen, "se", op.path, where)
+            elif isinstance(op, Choices):
+                for label, jump in op.choices:
+                    if jump not in scenario:
+                        errors.append(f"{where}: choice {label!r} jumps to unknown chapter {jump!r}")
+                    elif jump not in entry["jumps"]:
+                        entry["jumps"].append(jump)
+        if not isinstance(op, (Choices, End)):
+            warnings.append(f"{key}: chapter ends without choices or end")
+        chapters[key] = entry
+
+    # 最初のチャプターから choices でたどれるチャプター
+    start = next(iter(scenario), None)
+    reachable = set()
+    if start is not None:
+        reachable.add(start)
+        queue = deque([start])
+        while queue:
+            for jump in chapters[queue.popleft()]["jumps"]:
+                if jump not in reachable:
+                    reachable.add(jump)
+                    queue.append(jump)
+    for key in scenario:
+        if key not in reachable:
+            warnings.append(f"{key}: chapter is unreachable from {start}")
+
+    all_assets = sorted({asset_key(path) for path in exists})
+    manifest = {"start": start, "chapters": chapters, "assets": all_assets}
+    return errors, warnings, manifest
+
+
+def load_json(path):
+    with open(path, encoding="utf-8-sig") as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="シナリオのチェックと素材マニフェストの書き出し")
+    parser.add_argument("scenarios", nargs="*", help="チェックするシナリオ（省略時は scenarios/*.json）")
+    parser.add_argument("--manifest", help="素材マニフェストを書き出すJSONファイル（シナリオ名ごとにまとめる）")
+    parser.add_argument("--strict", action="store_true", help="警告もエラーとして扱う")
+    args = parser.parse_args(argv)
+    # 渡されたパスは呼び出し元のディレクトリ基準。素材のパスはリポジトリ基準なので、直してから移動する
+    args.scenarios = [os.path.abspath(path) for path in args.scenarios]
+    if args.manifest:
+        args.manifest = os.path.abspath(args.manifest)
+    os.chdir(ROOT)
+
+    paths = args.scenarios or sorted(glob.glob(os.path.join("scenarios", "*.json")))
+    manifests = {}
+    failed = False
+    for path in paths:
+        try:
+            scenario = load_json(path)
+        except (OSError, ValueError) as e:
+            print(f"{path}: could not load: {e}")
+            failed = True
+            continue
+        errors, warnings, manifest = analyze(scenario)
+        manifests[os.path.basename(path)] = manifest
+        for message in errors:
+            print(f"error: {path}:{message}")
+        for message in warnings:
+            print(f"warning: {path}:{message}")
+        lines = sum(len(lines) for lines in scenario.values())
+        print(f"{path}: {len(scenario)} chapters, {lines} lines, {len(manifest['assets'])} assets, "
+              f"{len(errors)} errors, {len(warnings)} warnings")
+        if errors or (args.strict and warnings):
+            failed = True
+
+    if args.manifest:
+        with open(args.manifest, "w", encoding="utf-8") as f:
+            json.dump(manifests, f, indent=2, ensure_ascii=False)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
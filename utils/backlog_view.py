@@ -0,0 +1,139 @@
+import pygame
+
+from utils.panel import darken
+
+
+class BacklogView:
+    """
+    バックログ画面。画面に入る行だけを文字キャッシュ（TextRenderer）から描くので、
+    履歴が何万行あっても1フレームの処理は見えている行数分で済む。
+    長いテキストは本文の列の幅で折り返し、スクロールは折り返した後の行単位で行う。
+    位置は (項目, その項目の何行目) で持ち、動かす時は通り過ぎる項目だけを折り返す（全項目は数えない）。
+    """
+
+    def __init__(self, backlog, text_renderer, rect, row_height, name_map, name_color_map, name_width, scale=1.0):
+        self.backlog = backlog
+        self.text_renderer = text_renderer
+        self.rect = rect  # 行を並べる範囲
+        self.row_height = row_height
+        self.name_map = name_map
+        self.name_color_map = name_color_map
+        self.name_width = name_width  # 名前の列の幅
+        self.text_width = max(1, rect.width - name_width)  # 本文の列の幅（ここで折り返す）
+        self.scale = scale  # スクロールバーの大きさに掛ける倍率
+        self.rows = max(1, rect.height // row_height)  # 一度に見える行数
+        self.top = (0, 0)  # 一番上に見えている (項目, 折り返した何行目)
+        self.is_open = False
+        self._background = None
+
+    def open(self, background):
+        """backgroundを暗くして下敷きにし、一番新しい行が見える位置で開く（backgroundは書き換える）"""
+        self.is_open = True
+        self.top = self.max_top()
+        self._background = background
+        darken(self._background, 180)
+
+    def close(self):
+        self.is_open = False
+        self._background = None
+
+    def lines(self, index):
+        """index番目の項目を折り返した ((開始位置, 行), ...)"""
+        return self.text_renderer.layout(self.backlog[index][1], self.text_width)
+
+    def max_top(self):
+        """一番下までスクロールした時の top（一番新しい行が一番下に来る位置）"""
+        remaining = self.rows
+        index = len(self.backlog) - 1
+        while index >= 0:
+            count = len(self.lines(index))
+            if count >= remaining:
+                return (index, count - remaining)
+            remaining -= count
+            index -= 1
+        return (0, 0)
+
+    def scroll(self, rows):
+        """rows行スクロールする（下端からさらに下へスクロールしたらFalse）"""
+        index, row = self.top
+        if rows > 0:
+            bottom = self.max_top()
+            while rows > 0 and (index, row) < bottom:
+                if row + 1 < len(self.lines(index)):
+                    row += 1
+                else:
+                    index += 1
+                    row = 0
+                rows -= 1
+            self.top = (index, row)
+            return rows == 0
+        while rows < 0 and (index, row) > (0, 0):
+            if row > 0:
+                row -= 1
+            else:
+                index -= 1
+                row = len(self.lines(index)) - 1
+            rows += 1
+        self.top = (index, row)
+        return True
+
+    def handle_event(self, event):
+        """入力を処理する。閉じる操作ならFalseを返す"""
+        if event.type == pygame.MOUSEWHEEL:
+            return self.scroll(-event.y * 3)
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 3:
+            return False
+        if event.type == pygame.KEYDOWN:
+            if event.key in (pygame.K_b, pygame.K_BACKSPACE):
+                return False
+            if event.key == pygame.K_HOME:
+                self.top = (0, 0)
+            elif event.key == pygame.K_END:
+                self.top = self.max_top()
+            else:
+                steps = {
+                    pygame.K_UP: -1,
+                    pygame.K_DOWN: 1,
+                    pygame.K_PAGEUP: -self.rows,
+                    pygame.K_PAGEDOWN: self.rows,
+                }
+                if event.key in steps:
+                    self.scroll(steps[event.key])
+        return True
+
+    def render(self, screen):
+        screen.blit(self._background, (0, 0))
+        y = self.rect.y
+        index, row = self.top
+        drawn = 0
+        while drawn < self.rows and index < len(self.backlog):
+            name_id, text = self.backlog[index]
+            lines = self.lines(index)
+            if row == 0:
+                name = self.name_map.get(name_id, "")
+                if name:
+                    name_color = self.name_color_map.get(name, (255, 255, 255))
+                    screen.blit(self.text_renderer.render(name, name_color), (self.rect.x, y))
+            while row < len(lines) and drawn < self.rows:
+                screen.blit(self.text_renderer.render(lines[row][1], (255, 255, 255)), (self.rect.x + self.name_width, y))
+                y += self.row_height
+                drawn += 1
+                row += 1
+            index += 1
+            row = 0
+
+        # スクロールバー（全体の行数は数えないので、位置は項目の単位で表す）
+        bottom = self.max_top()
+        if bottom != (0, 0):
+            bar_x = self.rect.right + self._length(10)
+            bar_w = self._length(6)
+            pygame.draw.rect(screen, (80, 80, 80), (bar_x, self.rect.y, bar_w, self.rect.height))
+            shown = max(1, index - self.top[0])  # 画面に出ている項目の数
+            bar_h = max(self._length(20), self.rect.height * shown // max(shown, len(self.backlog)))
+            position = self.top[0] + self.top[1] / len(self.lines(self.top[0]))
+            end = bottom[0] + bottom[1] / len(self.lines(bottom[0]))
+            bar_y = self.rect.y + int((self.rect.height - bar_h) * min(1.0, position / end))
+            pygame.draw.rect(screen, (220, 220, 220), (bar_x, bar_y, bar_w, bar_h))
+
+    def _length(self, value):
+        return max(1, round(value * self.scale))
@@ -1,57 +1,101 @@
-from base import SceneBase
 import pygame
-import sys
+
+from systems.display import mouse_pos
+from systems.profiler import profiler
+from systems.resources import resources
+
+# ボタンが借りている共有フォント（ボタン画像の作り置きと同じく、借りたらプロセスが終わるまで持つ）
+_fonts = {}
+# ボタン画像は (文字, サイズ, 背景色, 文字色, フォント, 倍率) ごとに通常時・ホバー時を作り置きする
+_button_cache = {}
+# 同じ位置のボタンには同じRectを返す
+_rect_cache = {}
+
+
+def get_font(font_path, font_size, bold=False):
+    """共有のフォントを返す（font_pathがNoneならデフォルトフォント）"""
+    key = (font_path, font_size, bold)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = resources.font(font_path, font_size, bold=bold)
+    return font
+
 
 def is_button_clicked(button_rect, event):
     """ボタンがクリックされたかどうかを判定する関数"""
     # イベントが無効な場合は早期リターン
     if event.type != pygame.MOUSEBUTTONDOWN:
         return False
-        
+
     # ボタンの矩形内にマウス位置があるかチェック
     return button_rect.collidepoint(event.pos)
 
-def draw_button(screen, text, position, font_size=48, bg_color=(40, 60, 120), text_color=(255, 255, 255), font_path=None):
-    """シンプルでかっこいいボタンを描画"""
-    if font_path:
-        font = pygame.font.Font(font_path, font_size)
-    else:
-        font = pygame.font.Font(None, font_size)
-    font.set_bold(True)
+
+def shadow_offset(scale=1.0):
+    """ボタンの影を本体からずらす量（右下へ、ピクセル）"""
+    return max(1, round(4 * scale))
+
+
+def _build_button(text, font_size, bg_color, text_color, font_path, scale=1.0):
+    """影・本体・文字をまとめた通常時とホバー時のボタン画像を作る（余白・角丸・影はscale倍）"""
+    font = get_font(font_path, font_size, bold=True)
     text_surface = font.render(text, True, text_color)
+    profiler.count("font_render")
     text_rect = text_surface.get_rect()
 
-    padding_x, padding_y = 36, 18
-    button_rect = pygame.Rect(
-        position[0],
-        position[1],
-        text_rect.width + padding_x * 2,
-        text_rect.height + padding_y * 2
-    )
+    padding_x, padding_y = round(36 * scale), round(18 * scale)
+    radius = max(1, round(18 * scale))
+    border = max(1, round(2 * scale))
+    shadow = shadow_offset(scale)
+    width = text_rect.width + padding_x * 2
+    height = text_rect.height + padding_y * 2
+
+    # 影・本体・文字を乗算済みアルファで重ねておく（画面へもBLEND_PREMULTIPLIEDで描くと、毎回重ねて描くのと同じ見た目になる）
+    shadow_surf = pygame.Surface((width, height), pygame.SRCALPHA)
+    shadow_color = (0, 0, 0, 80)
+    pygame.draw.rect(shadow_surf, shadow_color, shadow_surf.get_rect(), border_radius=radius)
+    shadow_surf = shadow_surf.premul_alpha()
+    text_surface = text_surface.convert_alpha().premul_alpha()
+
+    images = []
+    for is_hover in (False, True):
+        # 影の分だけ大きく作る
+        surf = pygame.Surface((width + shadow, height + shadow), pygame.SRCALPHA)
+
+        # シャドウ
+        surf.blit(shadow_surf, (shadow, shadow), special_flags=pygame.BLEND_PREMULTIPLIED)
+
+        # ボタン本体
+        btn_surf = pygame.Surface((width, height), pygame.SRCALPHA)
+        base_color = (bg_color[0], bg_color[1], bg_color[2], 180 if not is_hover else 230)
+        pygame.draw.rect(btn_surf, base_color, btn_surf.get_rect(), border_radius=radius)
+        pygame.draw.rect(btn_surf, (255, 255, 255, 120), btn_surf.get_rect(), border, border_radius=radius)
+        surf.blit(btn_surf.premul_alpha(), (0, 0), special_flags=pygame.BLEND_PREMULTIPLIED)
+
+        # テキスト中央
+        text_pos = ((width - text_rect.width) // 2, (height - text_rect.height) // 2)
+        surf.blit(text_surface, text_pos, special_flags=pygame.BLEND_PREMULTIPLIED)
+        images.append(surf)
+    return images[0], images[1], (width, height)
+
+
+def draw_button(screen, text, position, font_size=48, bg_color=(40, 60, 120), text_color=(255, 255, 255), font_path=None, scale=1.0):
+    """シンプルでかっこいいボタンを描画（font_sizeは描画先のピクセル、scaleは余白・角丸の倍率）"""
+    key = (text, font_size, tuple(bg_color), tuple(text_color), font_path, scale)
+    entry = _button_cache.get(key)
+    if entry is None:
+        entry = _build_button(text, font_size, bg_color, text_color, font_path, scale)
+        _button_cache[key] = entry
+    normal, hover, size = entry
+
+    rect_key = (key, position[0], position[1])
+    button_rect = _rect_cache.get(rect_key)
+    if button_rect is None:
+        button_rect = pygame.Rect(position, size)
+        _rect_cache[rect_key] = button_rect
 
     # マウスオーバー判定
-    mouse_pos = pygame.mouse.get_pos()
-    is_hover = button_rect.collidepoint(mouse_pos)
+    is_hover = button_rect.collidepoint(mouse_pos())
+    screen.blit(hover if is_hover else normal, button_rect.topleft, special_flags=pygame.BLEND_PREMULTIPLIED)
 
-    # シャドウ
-    shadow_rect = button_rect.copy()
-    shadow_rect.x += 4
-    shadow_rect.y += 4
-    shadow_color = (0, 0, 0, 80)
-    shadow_surf = pygame.Surface((shadow_rect.width, shadow_rect.height), pygame.SRCALPHA)
-    pygame.draw.rect(shadow_surf, shadow_color, shadow_surf.get_rect(), border_radius=18)
-    screen.blit(shadow_surf, (shadow_rect.x, shadow_rect.y))
-
-    # ボタン本体
-    btn_surf = pygame.Surface((button_rect.width, button_rect.height), pygame.SRCALPHA)
-    base_color = (bg_color[0], bg_color[1], bg_color[2], 180 if not is_hover else 230)
-    pygame.draw.rect(btn_surf, base_color, btn_surf.get_rect(), border_radius=18)
-    pygame.draw.rect(btn_surf, (255, 255, 255, 120), btn_surf.get_rect(), 2, border_radius=18)
-    screen.blit(btn_surf, (button_rect.x, button_rect.y))
-
-    # テキスト中央
-    text_x = button_rect.x + (button_rect.width - text_rect.width) // 2
-    text_y = button_rect.y + (button_rect.height - text_rect.height) // 2
-    screen.blit(text_surface, (text_x, text_y))
-
-    return button_rect
\ No newline at end of file
+    return button_rect
@@ -0,0 +1,56 @@
+import os
+
+import pygame
+
+
+def dirty_rects_enabled():
+    """環境変数 NOVEL_DIRTY_RECTS=1 で差分描画モードを有効にする"""
+    return os.environ.get("NOVEL_DIRTY_RECTS", "") not in ("", "0")
+
+
+class DirtyTracker:
+    """
+    書き換えが必要な領域（ダーティ矩形）を記録し、その部分だけを画面に送る。
+    無効時は毎フレーム全画面を描いてflip()する（従来どおり）。
+    有効時は何も変わっていないフレームの描画をまるごと省略する。
+    """
+
+    def __init__(self, enabled=None):
+        self.enabled = dirty_rects_enabled() if enabled is None else enabled
+        self.full = True  # 最初のフレームは全画面
+        self.rects = []
+        self._hover = {}  # ボタンごとのホバー状態
+
+    def mark(self, rect):
+        """rectの範囲を描き直す"""
+        if rect is not None:
+            self.rects.append(pygame.Rect(rect))
+
+    def mark_all(self):
+        """全画面を描き直す"""
+        self.full = True
+
+    def track_hover(self, key, rect, pos, shadow=4):
+        """ホバー状態が変わったボタンだけ描き直す（右下へshadowずれた影の分も含める）"""
+        is_hover = rect.collidepoint(pos)
+        if self._hover.get(key) != is_hover:
+            self._hover[key] = is_hover
+            self.mark(rect.union(rect.move(shadow, shadow)))
+
+    def is_dirty(self):
+        return not self.enabled or self.full or bool(self.rects)
+
+    def clip_rect(self):
+        """描画時に使うクリップ範囲（全画面ならNone）"""
+        if not self.enabled or self.full or not self.rects:
+            return None
+        return self.rects[0].unionall(self.rects[1:])
+
+    def present(self):
+        """描いた部分を画面に反映する"""
+        if not self.enabled or self.full:
+            pygame.display.flip()
+        elif self.rects:
+            pygame.display.update(self.rects)
+        self.full = False
+        self.rects = []
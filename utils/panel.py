@@ -0,0 +1,58 @@
+import pygame
+
+# 半透明の枠（テキストウィンドウ・選択肢ボタンなど）は (サイズ, 色, 枠線, 角丸) ごとに一度だけ作る。
+# 解像度や配色が変わればキーが変わるので、その時だけ作り直される
+_panel_cache = {}
+# フェード用の黒いSurface（画面の大きさごと）
+_black_cache = {}
+
+
+def get_panel(size, fill_color, border_color=None, border_width=0, border_radius=0, fill_radius=None):
+    """
+    角丸の半透明パネル画像を返す（毎フレーム呼んでも新しいSurfaceは作らない）。
+    fill_radiusを省略すると塗りも枠線と同じ角丸にする（0なら塗りは四角いまま）。
+    """
+    if fill_radius is None:
+        fill_radius = border_radius
+    key = (tuple(size), tuple(fill_color), tuple(border_color) if border_color else None, border_width, border_radius, fill_radius)
+    surface = _panel_cache.get(key)
+    if surface is None:
+        surface = pygame.Surface(size, pygame.SRCALPHA)
+        rect = surface.get_rect()
+        if fill_radius:
+            pygame.draw.rect(surface, fill_color, rect, border_radius=fill_radius)
+        else:
+            surface.fill(fill_color)
+        if border_color and border_width:
+            pygame.draw.rect(surface, border_color, rect, border_width, border_radius=border_radius)
+        _panel_cache[key] = surface
+    return surface
+
+
+def clear_panels():
+    """作り置きしたパネルを捨てる（画面モードを作り直したとき用）"""
+    _panel_cache.clear()
+    _black_cache.clear()
+
+
+def darken(screen, alpha):
+    """
+    画面全体に黒をalpha（0〜255）の濃さで重ねる（フェード用）。
+    黒いSurfaceは画面の大きさごとに1枚だけ作り置きし、濃さはSurface全体のalphaで変える
+    （乗算の塗りつぶしより、SDLのalphaブレンドの方がずっと速い）。
+    set_clipの範囲だけが対象になる。
+    """
+    alpha = max(0, min(255, int(alpha)))
+    if alpha == 0:
+        return
+    if alpha == 255:
+        screen.fill((0, 0, 0))
+        return
+    size = screen.get_size()
+    black = _black_cache.get(size)
+    if black is None:
+        black = pygame.Surface(size, 0, screen)
+        black.fill((0, 0, 0))
+        _black_cache[size] = black
+    black.set_alpha(alpha)
+    screen.blit(black, (0, 0))
@@ -0,0 +1,65 @@
+import pygame
+
+
+class StageCompositor:
+    """
+    背景と立ち絵（複数の枠）を1枚に焼き込んでおくレイヤー。
+    bg/cha命令で中身が変わった時だけ焼き直すので、毎フレームの描画は立ち絵が何枚あっても全画面1回のblitで済む。
+    立ち絵は重なり順（z）の小さい順、同じzなら置いた順に描く。
+    """
+
+    def __init__(self, size, bg_color):
+        self.size = size
+        self.bg_color = bg_color
+        self.background = None  # 画面サイズに変換済みの背景（無ければbg_colorで塗る）
+        self.sprites = {}  # 枠名 -> (z, 置いた順, サーフェス, 描画位置)
+        self._order = 0
+        self._baked = None  # 焼き込み済みの画面（大きさが同じ間は使い回す）
+        self._valid = False
+        self.bakes = 0  # 焼き直した回数
+
+    def set_background(self, surface):
+        self.background = surface
+        self._valid = False
+
+    def set_sprite(self, slot, surface, pos, z=0):
+        """slotの立ち絵を置き換える（同じ枠に置き直した時は前の重なりの順番を引き継ぐ）"""
+        old = self.sprites.get(slot)
+        if old is not None and old[0] == z:
+            order = old[1]
+        else:
+            self._order += 1
+            order = self._order
+        self.sprites[slot] = (z, order, surface, pos)
+        self._valid = False
+
+    def remove_sprite(self, slot):
+        if self.sprites.pop(slot, None) is not None:
+            self._valid = False
+
+    def clear_sprites(self):
+        if self.sprites:
+            self.sprites.clear()
+            self._valid = False
+
+    def surface(self):
+        """背景と立ち絵を重ねた画面を返す（変更が無ければ前回焼いたものをそのまま返す）"""
+        if not self.sprites and self.background is not None:
+            # 立ち絵が無ければ背景そのものを使う（焼き込みのコピーも要らない）
+            return self.background
+        if self._valid:
+            return self._baked
+        if self._baked is None or self._baked.get_size() != self.size:
+            self._baked = pygame.Surface(self.size).convert()
+        if self.background is not None:
+            self._baked.blit(self.background, (0, 0))
+        else:
+            self._baked.fill(self.bg_color)
+        for _, _, sprite, pos in sorted(self.sprites.values(), key=lambda item: item[:2]):
+            self._baked.blit(sprite, pos)
+        self._valid = True
+        self.bakes += 1
+        return self._baked
+
+    def draw(self, screen):
+        screen.blit(self.surface(), (0, 0))
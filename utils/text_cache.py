@@ -0,0 +1,111 @@
+from collections import OrderedDict
+
+import pygame
+
+from systems.image_cache import SurfaceCache, surface_bytes
+from systems.profiler import profiler
+from utils.wrap import wrap_text
+
+
+class TextRenderer:
+    """
+    1つのフォント用の文字描画キャッシュ。
+    文字（グリフ）は (文字, 色) ごとに一度だけラスタライズし、行はグリフを並べて作る。
+    表示しきった行はキャッシュし、タイプライター演出中の行はグリフを1つずつ追加で描き足す。
+    """
+
+    def __init__(self, font, max_bytes=32 * 1024 * 1024):
+        self.font = font
+        self.height = font.get_height()
+        self._glyphs = {}  # (文字, 色) -> Surface
+        self._lines = SurfaceCache(max_bytes)  # (行, 色) -> Surface
+        self._anim = None  # [行, 色, Surface, 描画済み文字数, 次のx座標]
+        self._advances = {}  # 文字 -> 送り幅（フォントごとに1回だけ測る）
+        self._layouts = OrderedDict()  # (テキスト, 幅) -> 折り返し結果
+        self.max_layouts = 4096
+        self.glyph_renders = 0  # font.renderを呼んだ回数
+        self.layouts = 0  # 折り返しを計算した回数
+
+    def glyph(self, ch, color):
+        key = (ch, color)
+        surface = self._glyphs.get(key)
+        if surface is None:
+            surface = self.font.render(ch, True, color)
+            self._glyphs[key] = surface
+            self.glyph_renders += 1
+            profiler.count("font_render")
+        return surface
+
+    def advance(self, ch):
+        """文字の送り幅"""
+        width = self._advances.get(ch)
+        if width is None:
+            width = self._advances[ch] = self.font.size(ch)[0]
+        return width
+
+    def layout(self, text, max_width):
+        """
+        textを幅max_widthで折り返した ((開始位置, 行), ...) を返す（禁則処理つき）。
+        結果は (テキスト, 幅) ごとにキャッシュするので、毎フレーム呼んでも測り直さない。
+        """
+        key = (text, max_width)
+        lines = self._layouts.get(key)
+        if lines is not None:
+            self._layouts.move_to_end(key)
+            return lines
+        lines = wrap_text(text, self.advance, max_width)
+        self._layouts[key] = lines
+        if len(self._layouts) > self.max_layouts:
+            self._layouts.popitem(last=False)
+        self.layouts += 1
+        return lines
+
+    def _new_line_surface(self, text, color):
+        width = 0
+        for ch in text:
+            width += self.glyph(ch, color).get_width()
+        surface = pygame.Surface((max(1, width), self.height), pygame.SRCALPHA)
+        # 透明部分も文字色にしておくと、アルファ合成で縁が黒ずまない
+        surface.fill((color[0], color[1], color[2], 0))
+        return surface
+
+    def render(self, text, color):
+        """行全体のサーフェスを返す（2回目以降はキャッシュから）"""
+        key = (text, color)
+        surface = self._lines.get(key)
+        if surface is None:
+            surface = self._new_line_surface(text, color)
+            x = 0
+            for ch in text:
+                glyph = self.glyph(ch, color)
+                surface.blit(glyph, (x, 0))
+                x += glyph.get_width()
+            self._lines.put(key, surface, surface_bytes(surface))
+        return surface
+
+    def render_prefix(self, text, color, count):
+        """
+        textの先頭count文字だけを描いたサーフェスを返す（タイプライター演出用）。
+        前回の続きなら増えた文字だけを描き足す。
+        """
+        key = (text, color)
+        if count >= len(text) and key in self._lines:
+            return self._lines.get(key)
+        count = min(count, len(text))
+        anim = self._anim
+        if anim is None or anim[0] != text or anim[1] != color or count < anim[3]:
+            anim = [text, color, self._new_line_surface(text, color), 0, 0]
+            self._anim = anim
+        surface = anim[2]
+        x = anim[4]
+        for ch in text[anim[3]:count]:
+            glyph = self.glyph(ch, color)
+            surface.blit(glyph, (x, 0))
+            x += glyph.get_width()
+        anim[3] = count
+        anim[4] = x
+        if count == len(text):
+            # 表示しきった行はそのまま行キャッシュへ移す
+            self._lines.put(key, surface, surface_bytes(surface))
+            self._anim = None
+        return surface
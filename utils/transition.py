@@ -0,0 +1,125 @@
+import pygame
+
+from utils.panel import darken
+
+# 切り替えの種類
+#   in        : 黒から今の画面へ
+#   out       : 今の画面から黒へ（シーンを抜ける時）
+#   fade      : 切り替え前の画面 → 黒 → 今の画面
+#   crossfade : 切り替え前の画面から今の画面へ重ねながら
+#   wipe      : 切り替え前の画面を左から右へ拭き取る
+KINDS = ("in", "out", "fade", "crossfade", "wipe")
+
+# 0〜255の進み具合に対する濃さ（ゆっくり始まってゆっくり終わる）。毎フレーム計算しないよう作り置きする
+_RAMP = [round(255 * t * t * (3 - 2 * t)) for t in (i / 255 for i in range(256))]
+
+
+def ramp(t):
+    """進み具合t（0〜1）を0〜255の濃さにする"""
+    return _RAMP[int(max(0.0, min(1.0, t)) * 255)]
+
+
+class Transition:
+    """
+    画面の切り替え演出。シーンのupdate/renderから少しずつ進めるので、ループを止めない。
+    ・start() した時点の画面を取っておき、render() の最後に draw() で今の画面と重ねる
+    ・速さは経過時間で決まる（フレームレートに依らない）
+    ・演出中のクリックやキー入力は filter() が溜めておき、終わった後にまとめて渡す
+    重ねる処理は取っておいた画面と作り置きの黒いSurfaceをalphaつきでblitするだけなので、1080pでも1フレーム数ミリ秒で済む。
+    """
+
+    def __init__(self):
+        self.kind = None  # 演出中でなければNone
+        self.duration = 0.0
+        self.elapsed = 0.0
+        self.on_done = None
+        self._finished = None  # このフレームで終わった演出の種類（draw()で最後の状態を描く）
+        self._before = None  # 切り替え前の画面（大きさが同じなら使い回す）
+        self._buffered = []  # 演出中に溜めた入力
+        self.max_buffered = 8
+
+    @property
+    def active(self):
+        return self.kind is not None
+
+    def start(self, screen, kind, duration, on_done=None):
+        """screenに今出ている画面からの切り替えを始める。on_doneは終わった時に呼ばれる"""
+        if kind not in KINDS:
+            raise ValueError(f"unknown transition: {kind}")
+        if kind in ("fade", "crossfade", "wipe"):
+            if self._before is None or self._before.get_size() != screen.get_size():
+                self._before = screen.copy()
+            else:
+                self._before.blit(screen, (0, 0))
+            # 前回のcrossfadeで付けた透明度が残っていると古い画面が薄くしか出ない
+            self._before.set_alpha(None)
+        self.kind = kind
+        self._finished = None
+        self.duration = max(duration, 1e-6)
+        self.elapsed = 0.0
+        self.on_done = on_done
+
+    def cancel(self):
+        """演出をやめる（溜めた入力も捨てる）"""
+        self.kind = None
+        self.on_done = None
+        self._finished = None
+        self._buffered.clear()
+
+    def update(self, dt):
+        """時間を進める。演出中（画面全体の描き直しが必要）ならTrue"""
+        if self.kind is None:
+            return False
+        self.elapsed += dt
+        if self.elapsed >= self.duration:
+            on_done = self.on_done
+            # on_doneでシーンが切り替わるのは描画の後なので、このフレームは最後の状態（outなら真っ黒）のまま描く
+            self._finished = self.kind
+            self.kind = None
+            self.on_done = None
+            if on_done is not None:
+                on_done()
+        return True
+
+    def filter(self, events):
+        """
+        シーンが処理すべきイベントを返す。演出中はクリック・キー入力を溜めて何も返さず、
+        終わった後の最初の呼び出しで溜めた分を先に返す。
+        """
+        if self.kind is not None:
+            for event in events:
+                if event.type in (pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN) and len(self._buffered) < self.max_buffered:
+                    self._buffered.append(event)
+            return [event for event in events if event.type == pygame.QUIT]
+        if self._buffered:
+            events = self._buffered + list(events)
+            self._buffered = []
+        return events
+
+    def draw(self, screen):
+        """シーンが描き終えた今の画面に、切り替えの演出を重ねる（演出中でなければ何もしない）"""
+        if self.kind is not None:
+            kind = self.kind
+            t = self.elapsed / self.duration
+        elif self._finished is not None:
+            kind = self._finished
+            self._finished = None
+            t = 1.0
+        else:
+            return
+        if kind == "in":
+            darken(screen, 255 - ramp(t))
+        elif kind == "out":
+            darken(screen, ramp(t))
+        elif kind == "fade":
+            if t < 0.5:
+                screen.blit(self._before, (0, 0))
+                darken(screen, ramp(t * 2))
+            else:
+                darken(screen, 255 - ramp(t * 2 - 1))
+        elif kind == "crossfade":
+            self._before.set_alpha(255 - ramp(t))
+            screen.blit(self._before, (0, 0))
+        elif kind == "wipe":
+            x = ramp(t) * screen.get_width() // 255
+            screen.blit(self._before, (x, 0), pygame.Rect(x, 0, screen.get_width() - x, screen.get_height()))
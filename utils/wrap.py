@@ -0,0 +1,63 @@
+# 日本語の禁則処理つきの折り返し
+
+# 行頭に来てはいけない文字（句読点・閉じ括弧・小書きの仮名・長音など）
+NO_START = frozenset(
+    "、。，．・：；？！ー～…‥）」』】〕｝〉》］’”ゝゞヽヾ々"
+    "ぁぃぅぇぉっゃゅょゎゕゖァィゥェォッャュョヮヵヶ"
+    ",.:;!?)]}%"
+)
+# 行末に来てはいけない文字（開き括弧など）
+NO_END = frozenset("（「『【〔｛〈《［‘“([{")
+# 行末からはみ出して置いてよい文字（ぶら下げ）
+HANGING = frozenset("、。，．,.")
+
+
+def can_break(text, index):
+    """text[index - 1] と text[index] の間で改行してよいか"""
+    prev = text[index - 1]
+    ch = text[index]
+    if ch in NO_START or prev in NO_END:
+        return False
+    # 英単語・数字の途中では切らない
+    if prev.isascii() and prev.isalnum() and ch.isascii() and ch.isalnum():
+        return False
+    return True
+
+
+def wrap_text(text, advance, max_width):
+    """
+    textを幅max_widthに収まるように折り返し、((開始位置, 行の文字列), ...) を返す。
+    advance(文字) は文字の送り幅。文字ごとに1回ずつしか呼ばないので、処理は文字数に比例する
+    （禁則で改行位置を戻す分は、その行の中だけで済む）。
+    句読点は1文字までぶら下げ、それでも行頭・行末の禁則に当たる時は前の文字ごと次の行へ送る。
+    禁則を守れる位置が行の中に無い時は幅で切る。
+    """
+    if not text:
+        return ((0, ""),)
+    lines = []
+    start = 0
+    length = len(text)
+    while start < length:
+        width = 0
+        end = start
+        while end < length:
+            w = advance(text[end])
+            if width + w > max_width and end > start:
+                break
+            width += w
+            end += 1
+        if end < length:
+            if text[end] in HANGING:
+                end += 1
+            if end < length:
+                brk = end
+                while brk > start + 1 and not can_break(text, brk):
+                    brk -= 1
+                if can_break(text, brk):
+                    end = brk
+        lines.append((start, text[start:end]))
+        start = end
+        # 折り返し位置の半角スペースは次の行の頭に持ち越さない
+        while start < length and text[start] == " ":
+            start += 1
+    return tuple(lines)